@@ -9,6 +9,7 @@ from flask import Flask
 from app.config import get_config
 from app.extensions import init_extensions, create_tables
 from app.utils.error_handlers import register_error_handlers
+from app.utils.json_provider import OrjsonProvider
 
 __version__ = '1.0.0'
 __author__ = 'Equipe Move Marias'
@@ -25,6 +26,7 @@ def create_app(config_name=None):
         Flask: Instância configurada da aplicação
     """
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Carregar configuração
     if config_name:
@@ -42,6 +44,11 @@ def create_app(config_name=None):
     # Registrar handlers de erro
     register_error_handlers(app)
     
+    # Verificar o banco em segundo plano para os health checks
+    if not app.testing:
+        from app.routes.health import start_db_health_worker
+        start_db_health_worker(app)
+    
     # Criar tabelas se necessário
     if app.config.get('SEED_DATABASE', False):
         create_tables(app)
@@ -58,7 +65,9 @@ def register_blueprints(app):
         app: Instância da aplicação Flask
     """
     from app.routes.health import health_bp
-    from app.routes.auth import auth_bp
+    from app.routes.auth import auth_bp, init_auth_config
+    
+    init_auth_config(app)
     
     # Registrar blueprints
     app.register_blueprint(health_bp)
@@ -13,8 +13,11 @@ from flask_migrate import Migrate
 from flask_redis import FlaskRedis
 from flask_bcrypt import Bcrypt
 from flask_caching import Cache
+from argon2 import PasswordHasher
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
 
 # Inicialização das extensões
@@ -23,8 +26,9 @@ ma = Marshmallow()
 jwt = JWTManager()
 cors = CORS()
 migrate = Migrate()
-redis_client = FlaskRedis()
-bcrypt = Bcrypt()
+redis_client = FlaskRedis(max_connections=50)
+bcrypt = Bcrypt()  # apenas para verificar hashes legados
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 cache = Cache()
 
 
@@ -95,8 +99,16 @@ def setup_logging(app):
         log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO').upper())
         file_handler.setLevel(log_level)
         
+        # As requisições só enfileiram os registros; a escrita em disco (e a
+        # rotação do arquivo) fica com a thread do QueueListener
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        app.extensions['log_listener'] = listener
+        
         # Adicionar handler ao logger da aplicação
-        app.logger.addHandler(file_handler)
+        app.logger.addHandler(QueueHandler(log_queue))
         app.logger.setLevel(log_level)
         
         app.logger.info(f'{app.config.get("APP_NAME", "Move Marias")} startup')
@@ -151,6 +163,12 @@ def setup_jwt_handlers(app):
             'message': 'O token foi revogado.'
         }), 401
     
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        """Verificar na lista de revogados do Redis se o token foi revogado."""
+        from app.services.token_blocklist import is_token_revoked
+        return is_token_revoked(jwt_payload['jti'])
+    
     @jwt.user_identity_loader
     def user_identity_lookup(user):
         """Definir identidade do usuário no JWT."""
@@ -158,10 +176,17 @@ def setup_jwt_handlers(app):
     
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        """Carregar usuário pelo JWT."""
+        """Carregar usuário pelo JWT (uma vez por requisição, via current_user)."""
         from app.models.usuario import Usuario
-        identity = jwt_data["sub"]
-        return Usuario.query.filter_by(id=identity).one_or_none()
+        return Usuario.find_by_id(jwt_data["sub"])
+    
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(_jwt_header, jwt_data):
+        """Handler para token de usuário inexistente."""
+        return jsonify({
+            'error': 'user_not_found',
+            'message': 'Usuário não encontrado.'
+        }), 401
     
     @jwt.additional_claims_loader
     def add_claims_to_jwt(identity):
@@ -12,7 +12,8 @@ from .recibo_beneficio import ReciboBeneficio
 from .anamnese_social import AnamneseSocial
 from .membro_familiar import MembroFamiliar
 from .ficha_evolucao import FichaEvolucao
-from .termo_consentimento import TermoConsentimento
+from .termo_consentimento import TermoConsentimento, ResponsavelLegalTermo, TestemunhaTermo
+from .stats_counter import StatsCounter
 
 # Modelos de avaliação e acompanhamento
 from .visao_holistica import VisaoHolistica, AspectosAvaliacao, NivelSituacao
@@ -41,6 +42,9 @@ __all__ = [
     'MembroFamiliar',
     'FichaEvolucao',
     'TermoConsentimento',
+    'ResponsavelLegalTermo',
+    'TestemunhaTermo',
+    'StatsCounter',
     # Modelos de avaliação e acompanhamento
     'VisaoHolistica',
     'AspectosAvaliacao',
@@ -0,0 +1,54 @@
+"""
+Utilitários compartilhados de serialização dos modelos.
+
+Gera to_dict (e a variante que lê linhas de resultado) como uma única
+função com literal de dicionário, montada a partir da lista de campos.
+"""
+
+
+class ReprFields(dict):
+    """Campos já carregados da instância; ausentes viram None sem disparar SELECT."""
+    
+    def __missing__(self, key):
+        return None
+
+
+# Conversões comuns por tipo de campo: recebe a expressão de leitura
+_CONVERSOES = {
+    None: lambda expr: expr,
+    'uuid': lambda expr: f'str({expr})',
+    'datetime': lambda expr: f'({expr}.isoformat() if {expr} else None)',
+}
+
+
+def build_serializer(modelo, nome, argumento, acesso, campos, extras=None):
+    """
+    Gerar um serializador como um único literal de dicionário.
+    
+    Args:
+        modelo (str): Nome do modelo, usado no nome de arquivo do código gerado
+        nome (str): Nome da função gerada
+        argumento (str): Nome do parâmetro ('self' ou 'row')
+        acesso (str): Molde de leitura de campo, ex. 'self.{}' ou 'row[{!r}]'
+        campos (tuple): Pares (chave, tipo) na ordem de saída
+        extras (dict): Tipos próprios do modelo; cada um recebe a função de
+            leitura de campo e devolve a expressão
+    
+    Returns:
+        function: Serializador gerado
+    """
+    def valor(campo):
+        return acesso.format(campo)
+    
+    itens = []
+    for chave, tipo in campos:
+        if extras and tipo in extras:
+            expr = extras[tipo](valor)
+        else:
+            expr = _CONVERSOES[tipo](valor(chave))
+        itens.append(f'{chave!r}: {expr}')
+    
+    fonte = f'def {nome}({argumento}):\n    return {{{", ".join(itens)}}}\n'
+    namespace = {}
+    exec(compile(fonte, f'<{modelo}.{nome}>', 'exec'), namespace)
+    return namespace[nome]
@@ -392,6 +392,21 @@ class Beneficiaria(db.Model):
         cpf_formatado = cls._format_cpf(cpf)
         return cls.query.filter_by(cpf=cpf_formatado).first()
     
+    @classmethod
+    def find_by_cpfs(cls, cpfs):
+        """
+        Buscar várias beneficiárias por CPF em uma única consulta.
+        
+        Args:
+            cpfs (iterable): CPFs das beneficiárias (com ou sem formatação)
+            
+        Returns:
+            dict: Beneficiárias encontradas, indexadas pelo CPF formatado
+        """
+        cpfs_formatados = [cls._format_cpf(cpf) for cpf in cpfs]
+        beneficiarias = cls.query.filter(cls.cpf.in_(cpfs_formatados)).all()
+        return {beneficiaria.cpf: beneficiaria for beneficiaria in beneficiarias}
+    
     @classmethod
     def find_by_id(cls, beneficiaria_id):
         """
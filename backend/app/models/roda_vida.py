@@ -6,9 +6,62 @@ que avalia diferentes áreas da vida da beneficiária em uma escala de 0 a 10.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, func, select
 from sqlalchemy.orm import relationship
 from app.extensions import db
+from app.models._serializers import ReprFields, build_serializer
+
+
+# Áreas da roda em to_dict: (chave, coluna do valor, coluna das observações)
+_AREAS_META = (
+    ('relacionamentos_familia', 'relacionamentos_familia', 'observacoes_relacionamentos'),
+    ('relacionamentos_amigos', 'relacionamentos_amigos', 'observacoes_amigos'),
+    ('amor_relacionamento', 'amor_relacionamento', 'observacoes_amor'),
+    ('carreira_trabalho', 'carreira_trabalho', 'observacoes_carreira'),
+    ('financas', 'financas', 'observacoes_financas'),
+    ('saude_bem_estar', 'saude_bem_estar', 'observacoes_saude'),
+    ('desenvolvimento_pessoal', 'desenvolvimento_pessoal', 'observacoes_desenvolvimento'),
+    ('lazer_diversao', 'lazer_diversao', 'observacoes_lazer'),
+    ('espiritualidade', 'espiritualidade', 'observacoes_espiritualidade'),
+    ('ambiente_fisico', 'ambiente_fisico', 'observacoes_ambiente'),
+    ('contribuicao_social', 'contribuicao_social', 'observacoes_contribuicao'),
+    ('educacao_aprendizado', 'educacao_aprendizado', 'observacoes_educacao'),
+)
+
+_ANALISE_FIELDS = (
+    'areas_prioritarias',
+    'objetivos_curto_prazo',
+    'objetivos_medio_prazo',
+    'objetivos_longo_prazo',
+    'acoes_imediatas',
+)
+
+# Chaves de to_dict na ordem de saída: (chave, tipo)
+_TO_DICT_FIELDS = (
+    ('id', None),
+    ('beneficiaria_id', None),
+    ('data_avaliacao', 'datetime'),
+    ('profissional_responsavel', None),
+    ('observacoes_gerais', None),
+    ('areas', 'areas'),
+    ('analise', 'analise'),
+    ('data_proxima_avaliacao', 'datetime'),
+    ('criado_em', 'datetime'),
+    ('atualizado_em', 'datetime'),
+    ('ativo', None),
+)
+
+
+# Tipos próprios de RodaVida em to_dict; os demais ficam com _serializers
+_SERIALIZER_EXTRAS = {
+    'areas': lambda valor: '{%s}' % ', '.join(
+        f"{area!r}: {{'valor': {valor(v)}, 'observacoes': {valor(o)}}}"
+        for area, v, o in _AREAS_META
+    ),
+    'analise': lambda valor: '{%s}' % ', '.join(
+        f'{campo!r}: {valor(campo)}' for campo in _ANALISE_FIELDS
+    ),
+}
 
 
 class RodaVida(db.Model):
@@ -30,7 +83,7 @@ class RodaVida(db.Model):
     beneficiaria = relationship('Beneficiaria', back_populates='rodas_vida')
     
     # Dados da avaliação
-    data_avaliacao = Column(DateTime, nullable=False, default=datetime.utcnow)
+    data_avaliacao = Column(DateTime, nullable=False, server_default=func.now())
     profissional_responsavel = Column(String(255), nullable=False)
     observacoes_gerais = Column(Text)
     
@@ -94,95 +147,26 @@ class RodaVida(db.Model):
     data_proxima_avaliacao = Column(DateTime)
     
     # Campos de auditoria
-    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
-    atualizado_em = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    criado_em = Column(DateTime, nullable=False, server_default=func.now())
+    atualizado_em = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     criado_por = Column(String(255))
     atualizado_por = Column(String(255))
     ativo = Column(Boolean, nullable=False, default=True)
     
+    # Timestamps preenchidos pelo banco voltam via RETURNING no mesmo INSERT/UPDATE
+    __mapper_args__ = {'eager_defaults': True}
+    
     def __init__(self, **kwargs):
         """Inicializar nova avaliação da Roda da Vida."""
         super().__init__(**kwargs)
     
+    _REPR_FMT = '<RodaVida {id} - Beneficiária {beneficiaria_id}>'
+    
     def __repr__(self):
         """Representação string do objeto."""
-        return f'<RodaVida {self.id} - Beneficiária {self.beneficiaria_id}>'
+        return self._REPR_FMT.format_map(ReprFields(self.__dict__))
     
-    def to_dict(self):
-        """
-        Converter objeto para dicionário.
-        
-        Returns:
-            dict: Dados da Roda da Vida
-        """
-        return {
-            'id': self.id,
-            'beneficiaria_id': self.beneficiaria_id,
-            'data_avaliacao': self.data_avaliacao.isoformat() if self.data_avaliacao else None,
-            'profissional_responsavel': self.profissional_responsavel,
-            'observacoes_gerais': self.observacoes_gerais,
-            'areas': {
-                'relacionamentos_familia': {
-                    'valor': self.relacionamentos_familia,
-                    'observacoes': self.observacoes_relacionamentos
-                },
-                'relacionamentos_amigos': {
-                    'valor': self.relacionamentos_amigos,
-                    'observacoes': self.observacoes_amigos
-                },
-                'amor_relacionamento': {
-                    'valor': self.amor_relacionamento,
-                    'observacoes': self.observacoes_amor
-                },
-                'carreira_trabalho': {
-                    'valor': self.carreira_trabalho,
-                    'observacoes': self.observacoes_carreira
-                },
-                'financas': {
-                    'valor': self.financas,
-                    'observacoes': self.observacoes_financas
-                },
-                'saude_bem_estar': {
-                    'valor': self.saude_bem_estar,
-                    'observacoes': self.observacoes_saude
-                },
-                'desenvolvimento_pessoal': {
-                    'valor': self.desenvolvimento_pessoal,
-                    'observacoes': self.observacoes_desenvolvimento
-                },
-                'lazer_diversao': {
-                    'valor': self.lazer_diversao,
-                    'observacoes': self.observacoes_lazer
-                },
-                'espiritualidade': {
-                    'valor': self.espiritualidade,
-                    'observacoes': self.observacoes_espiritualidade
-                },
-                'ambiente_fisico': {
-                    'valor': self.ambiente_fisico,
-                    'observacoes': self.observacoes_ambiente
-                },
-                'contribuicao_social': {
-                    'valor': self.contribuicao_social,
-                    'observacoes': self.observacoes_contribuicao
-                },
-                'educacao_aprendizado': {
-                    'valor': self.educacao_aprendizado,
-                    'observacoes': self.observacoes_educacao
-                }
-            },
-            'analise': {
-                'areas_prioritarias': self.areas_prioritarias,
-                'objetivos_curto_prazo': self.objetivos_curto_prazo,
-                'objetivos_medio_prazo': self.objetivos_medio_prazo,
-                'objetivos_longo_prazo': self.objetivos_longo_prazo,
-                'acoes_imediatas': self.acoes_imediatas
-            },
-            'data_proxima_avaliacao': self.data_proxima_avaliacao.isoformat() if self.data_proxima_avaliacao else None,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None,
-            'ativo': self.ativo
-        }
+    # to_dict é gerado no fim do módulo a partir de _TO_DICT_FIELDS
     
     def calcular_media_geral(self):
         """
@@ -349,6 +333,29 @@ class RodaVida(db.Model):
         
         return query.all()
     
+    @classmethod
+    def iter_dicts(cls, **filters):
+        """
+        Serializar avaliações direto das linhas do banco, sem instanciar o ORM.
+        
+        Usa cursor no servidor em lotes de 500 linhas, mantendo a memória
+        limitada em listagens grandes.
+        
+        Args:
+            **filters: Igualdades sobre colunas de roda_vida
+            
+        Yields:
+            dict: Mesmo formato de to_dict()
+        """
+        stmt = (
+            select(cls.__table__)
+            .filter_by(**filters)
+            .execution_options(yield_per=500, stream_results=True)
+        )
+        
+        for row in db.session.execute(stmt):
+            yield _row_to_dict(row._mapping)
+    
     @classmethod
     def get_ultima_avaliacao(cls, beneficiaria_id):
         """
@@ -408,3 +415,14 @@ class RodaVida(db.Model):
             erros.append('Data da próxima avaliação deve ser posterior à atual')
         
         return erros
+
+
+RodaVida.to_dict = build_serializer(
+    'RodaVida', 'to_dict', 'self', 'self.{}', _TO_DICT_FIELDS, _SERIALIZER_EXTRAS
+)
+RodaVida.to_dict.__doc__ = 'Converter objeto para dicionário com os dados da Roda da Vida.'
+
+# Mesmo formato de to_dict, lendo de row._mapping (ver iter_dicts)
+_row_to_dict = build_serializer(
+    'RodaVida', '_row_to_dict', 'row', 'row[{!r}]', _TO_DICT_FIELDS, _SERIALIZER_EXTRAS
+)
@@ -0,0 +1,94 @@
+"""
+Contadores agregados mantidos pelo banco de dados.
+
+Este módulo define a tabela stats_counters, atualizada por triggers do
+PostgreSQL a cada INSERT/DELETE ou mudança de `ativo` em usuarios e
+beneficiarias, para que as métricas leiam as contagens sem COUNT(*).
+"""
+
+from sqlalchemy import Column, String, BigInteger, DDL, event, select
+
+from app.extensions import db
+
+# Tabelas com contador de registros ativos (tabela -> chave do contador)
+CONTADORES_ATIVOS = {
+    'usuarios': 'usuarios_ativos',
+    'beneficiarias': 'beneficiarias_ativas'
+}
+
+_FUNCAO_CONTADOR = DDL("""
+CREATE OR REPLACE FUNCTION stats_contar_ativos() RETURNS trigger AS $$
+DECLARE
+    delta bigint;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta := COALESCE(NEW.ativo, false)::int;
+    ELSIF TG_OP = 'DELETE' THEN
+        delta := -COALESCE(OLD.ativo, false)::int;
+    ELSE
+        delta := COALESCE(NEW.ativo, false)::int - COALESCE(OLD.ativo, false)::int;
+    END IF;
+
+    IF delta <> 0 THEN
+        INSERT INTO stats_counters (chave, valor) VALUES (TG_ARGV[0], delta)
+        ON CONFLICT (chave) DO UPDATE SET valor = stats_counters.valor + EXCLUDED.valor;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+
+
+class StatsCounter(db.Model):
+    """Contador agregado identificado por uma chave."""
+    
+    __tablename__ = 'stats_counters'
+    
+    chave = Column(String(64), primary_key=True)
+    valor = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        """Representação string do contador."""
+        return f'<StatsCounter {self.chave}={self.valor}>'
+    
+    @classmethod
+    def get_valores(cls, chaves):
+        """
+        Obter o valor de vários contadores em uma consulta.
+        
+        Args:
+            chaves (iterable): Chaves dos contadores
+        
+        Returns:
+            dict: Valor de cada contador existente (chaves sem contador ficam
+                de fora: os triggers ainda não foram instalados nesse banco)
+        """
+        return dict(db.session.execute(
+            select(cls.chave, cls.valor).where(cls.chave.in_(list(chaves)))
+        ).all())
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _criar_triggers_contadores(metadata, connection, **kwargs):
+    """Criar os triggers dos contadores e carregar as contagens atuais."""
+    if connection.dialect.name != 'postgresql':
+        return
+    
+    connection.execute(_FUNCAO_CONTADOR)
+    
+    for tabela, chave in CONTADORES_ATIVOS.items():
+        if tabela not in metadata.tables:
+            continue
+        
+        connection.execute(DDL(f"""
+            DROP TRIGGER IF EXISTS trg_{chave} ON {tabela};
+            CREATE TRIGGER trg_{chave}
+            AFTER INSERT OR DELETE OR UPDATE OF ativo ON {tabela}
+            FOR EACH ROW EXECUTE FUNCTION stats_contar_ativos('{chave}')
+        """))
+        connection.execute(DDL(f"""
+            INSERT INTO stats_counters (chave, valor)
+            SELECT '{chave}', count(*) FROM {tabela} WHERE ativo
+            ON CONFLICT (chave) DO UPDATE SET valor = EXCLUDED.valor
+        """))
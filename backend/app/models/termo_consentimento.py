@@ -7,11 +7,54 @@ e tratamento de dados pessoais em conformidade com a LGPD.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import UUID, INET
+from sqlalchemy.orm import relationship, joinedload, raiseload
 
 from app.extensions import db
+from app.models._serializers import ReprFields, build_serializer
+
+# Endereço IP: INET no PostgreSQL, texto nos demais bancos (SQLite nos testes)
+_IP_TYPE = String(45).with_variant(INET(), 'postgresql')
+
+
+# Campos serializados por to_dict, na ordem de saída: (campo, tipo)
+_TO_DICT_FIELDS = (
+    ('id', 'uuid'),
+    ('beneficiaria_id', 'uuid'),
+    ('data_consentimento', 'datetime'),
+    ('nacionalidade', None),
+    ('estado_civil', None),
+    ('profissao', None),
+    ('tem_responsavel_legal', None),
+    ('nome_responsavel_legal', None),
+    ('cpf_responsavel_legal', None),
+    ('parentesco_responsavel', None),
+    ('uso_imagem_autorizado', None),
+    ('uso_imagem_finalidades', None),
+    ('tratamento_dados_autorizado', None),
+    ('finalidades_tratamento_dados', None),
+    ('compartilhamento_autorizado', None),
+    ('entidades_compartilhamento', None),
+    ('data_inicio_consentimento', 'datetime'),
+    ('data_fim_consentimento', 'datetime'),
+    ('consentimento_revogado', None),
+    ('data_revogacao', 'datetime'),
+    ('motivo_revogacao', None),
+    ('nome_testemunha1', None),
+    ('cpf_testemunha1', None),
+    ('nome_testemunha2', None),
+    ('cpf_testemunha2', None),
+    ('assinatura_voluntaria', None),
+    ('data_assinatura_voluntaria', 'datetime'),
+    ('assinatura_responsavel_familiar', None),
+    ('data_assinatura_responsavel', 'datetime'),
+    ('profissional_responsavel', None),
+    ('cargo_profissional', None),
+    ('observacoes', None),
+    ('criado_em', 'datetime'),
+    ('atualizado_em', 'datetime'),
+)
 
 
 class TermoConsentimento(db.Model):
@@ -78,24 +121,6 @@ class TermoConsentimento(db.Model):
         comment="Possui responsável legal?"
     )
     
-    nome_responsavel_legal = Column(
-        String(200),
-        nullable=True,
-        comment="Nome do responsável legal"
-    )
-    
-    cpf_responsavel_legal = Column(
-        String(14),
-        nullable=True,
-        comment="CPF do responsável legal"
-    )
-    
-    parentesco_responsavel = Column(
-        String(100),
-        nullable=True,
-        comment="Grau de parentesco do responsável"
-    )
-    
     # Consentimentos específicos
     uso_imagem_autorizado = Column(
         Boolean,
@@ -170,31 +195,6 @@ class TermoConsentimento(db.Model):
         comment="Motivo da revogação"
     )
     
-    # Testemunhas
-    nome_testemunha1 = Column(
-        String(200),
-        nullable=True,
-        comment="Nome da primeira testemunha"
-    )
-    
-    cpf_testemunha1 = Column(
-        String(14),
-        nullable=True,
-        comment="CPF da primeira testemunha"
-    )
-    
-    nome_testemunha2 = Column(
-        String(200),
-        nullable=True,
-        comment="Nome da segunda testemunha"
-    )
-    
-    cpf_testemunha2 = Column(
-        String(14),
-        nullable=True,
-        comment="CPF da segunda testemunha"
-    )
-    
     # Assinaturas digitais
     assinatura_voluntaria = Column(
         Boolean,
@@ -204,7 +204,7 @@ class TermoConsentimento(db.Model):
     )
     
     ip_assinatura_voluntaria = Column(
-        String(45),
+        _IP_TYPE,
         nullable=True,
         comment="IP da assinatura da voluntária"
     )
@@ -223,7 +223,7 @@ class TermoConsentimento(db.Model):
     )
     
     ip_assinatura_responsavel = Column(
-        String(45),
+        _IP_TYPE,
         nullable=True,
         comment="IP da assinatura do responsável"
     )
@@ -257,15 +257,15 @@ class TermoConsentimento(db.Model):
     # Auditoria
     criado_em = Column(
         DateTime,
-        default=datetime.utcnow,
+        server_default=func.now(),
         nullable=False,
         comment="Data de criação do registro"
     )
     
     atualizado_em = Column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=False,
         comment="Data da última atualização"
     )
@@ -277,61 +277,169 @@ class TermoConsentimento(db.Model):
         lazy="select"
     )
     
+    # Dados do responsável legal e das testemunhas ficam em tabelas satélite,
+    # vazias na maioria dos termos
+    responsavel_legal = relationship(
+        "ResponsavelLegalTermo",
+        back_populates="termo",
+        uselist=False,
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
+    
+    testemunhas = relationship(
+        "TestemunhaTermo",
+        back_populates="termo",
+        order_by="TestemunhaTermo.ordem",
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
+    
+    # Timestamps preenchidos pelo banco voltam via RETURNING no mesmo INSERT/UPDATE
+    __mapper_args__ = {'eager_defaults': True}
+    
+    _REPR_FMT = (
+        '<TermoConsentimento('
+        'id={id}, '
+        'beneficiaria_id={beneficiaria_id}, '
+        'data={data}, '
+        'uso_imagem={uso_imagem_autorizado}, '
+        'tratamento_dados={tratamento_dados_autorizado}'
+        ')>'
+    )
+    
     def __repr__(self):
         """Representação string do modelo."""
-        return (
-            f"<TermoConsentimento("
-            f"id={self.id}, "
-            f"beneficiaria_id={self.beneficiaria_id}, "
-            f"data={self.data_consentimento.strftime('%d/%m/%Y') if self.data_consentimento else 'N/A'}, "
-            f"uso_imagem={self.uso_imagem_autorizado}, "
-            f"tratamento_dados={self.tratamento_dados_autorizado}"
-            f")>"
-        )
-    
-    def to_dict(self):
-        """Converte o modelo para dicionário."""
-        return {
-            'id': str(self.id),
-            'beneficiaria_id': str(self.beneficiaria_id),
-            'data_consentimento': self.data_consentimento.isoformat() if self.data_consentimento else None,
-            'nacionalidade': self.nacionalidade,
-            'estado_civil': self.estado_civil,
-            'profissao': self.profissao,
-            'tem_responsavel_legal': self.tem_responsavel_legal,
-            'nome_responsavel_legal': self.nome_responsavel_legal,
-            'cpf_responsavel_legal': self.cpf_responsavel_legal,
-            'parentesco_responsavel': self.parentesco_responsavel,
-            'uso_imagem_autorizado': self.uso_imagem_autorizado,
-            'uso_imagem_finalidades': self.uso_imagem_finalidades,
-            'tratamento_dados_autorizado': self.tratamento_dados_autorizado,
-            'finalidades_tratamento_dados': self.finalidades_tratamento_dados,
-            'compartilhamento_autorizado': self.compartilhamento_autorizado,
-            'entidades_compartilhamento': self.entidades_compartilhamento,
-            'data_inicio_consentimento': self.data_inicio_consentimento.isoformat() if self.data_inicio_consentimento else None,
-            'data_fim_consentimento': self.data_fim_consentimento.isoformat() if self.data_fim_consentimento else None,
-            'consentimento_revogado': self.consentimento_revogado,
-            'data_revogacao': self.data_revogacao.isoformat() if self.data_revogacao else None,
-            'motivo_revogacao': self.motivo_revogacao,
-            'nome_testemunha1': self.nome_testemunha1,
-            'cpf_testemunha1': self.cpf_testemunha1,
-            'nome_testemunha2': self.nome_testemunha2,
-            'cpf_testemunha2': self.cpf_testemunha2,
-            'assinatura_voluntaria': self.assinatura_voluntaria,
-            'data_assinatura_voluntaria': self.data_assinatura_voluntaria.isoformat() if self.data_assinatura_voluntaria else None,
-            'assinatura_responsavel_familiar': self.assinatura_responsavel_familiar,
-            'data_assinatura_responsavel': self.data_assinatura_responsavel.isoformat() if self.data_assinatura_responsavel else None,
-            'profissional_responsavel': self.profissional_responsavel,
-            'cargo_profissional': self.cargo_profissional,
-            'observacoes': self.observacoes,
-            'criado_em': self.criado_em.isoformat(),
-            'atualizado_em': self.atualizado_em.isoformat()
-        }
+        campos = ReprFields(self.__dict__)
+        data = campos['data_consentimento']
+        campos['data'] = data.strftime('%d/%m/%Y') if data else 'N/A'
+        return self._REPR_FMT.format_map(campos)
+    
+    # to_dict é gerado no fim do módulo a partir de _TO_DICT_FIELDS
+    
+    # Acesso compatível aos antigos campos do responsável legal e das testemunhas
+    def _get_responsavel(self, campo):
+        if self.responsavel_legal is None:
+            return None
+        return getattr(self.responsavel_legal, campo)
+    
+    def _set_responsavel(self, campo, valor):
+        if self.responsavel_legal is None:
+            if valor is None:
+                return
+            self.responsavel_legal = ResponsavelLegalTermo()
+        setattr(self.responsavel_legal, campo, valor)
+    
+    def _get_testemunha(self, ordem, campo):
+        for testemunha in self.testemunhas:
+            if testemunha.ordem == ordem:
+                return getattr(testemunha, campo)
+        return None
+    
+    def _set_testemunha(self, ordem, campo, valor):
+        for testemunha in self.testemunhas:
+            if testemunha.ordem == ordem:
+                setattr(testemunha, campo, valor)
+                return
+        if valor is not None:
+            self.testemunhas.append(TestemunhaTermo(ordem=ordem, **{campo: valor}))
+    
+    nome_responsavel_legal = property(
+        lambda self: self._get_responsavel('nome'),
+        lambda self, valor: self._set_responsavel('nome', valor)
+    )
+    cpf_responsavel_legal = property(
+        lambda self: self._get_responsavel('cpf'),
+        lambda self, valor: self._set_responsavel('cpf', valor)
+    )
+    parentesco_responsavel = property(
+        lambda self: self._get_responsavel('parentesco'),
+        lambda self, valor: self._set_responsavel('parentesco', valor)
+    )
+    nome_testemunha1 = property(
+        lambda self: self._get_testemunha(1, 'nome'),
+        lambda self, valor: self._set_testemunha(1, 'nome', valor)
+    )
+    cpf_testemunha1 = property(
+        lambda self: self._get_testemunha(1, 'cpf'),
+        lambda self, valor: self._set_testemunha(1, 'cpf', valor)
+    )
+    nome_testemunha2 = property(
+        lambda self: self._get_testemunha(2, 'nome'),
+        lambda self, valor: self._set_testemunha(2, 'nome', valor)
+    )
+    cpf_testemunha2 = property(
+        lambda self: self._get_testemunha(2, 'cpf'),
+        lambda self, valor: self._set_testemunha(2, 'cpf', valor)
+    )
     
     @classmethod
     def find_by_beneficiaria(cls, beneficiaria_id):
-        """Busca termo por beneficiária."""
-        return cls.query.filter_by(beneficiaria_id=beneficiaria_id).first()
+        """
+        Busca termo por beneficiária.
+        
+        Não carrega `beneficiaria`: acessá-la levanta erro em vez de emitir
+        um SELECT extra. Use para to_dict() e checagens de consentimento.
+        """
+        return cls.query.options(raiseload(cls.beneficiaria))\
+                        .filter_by(beneficiaria_id=beneficiaria_id)\
+                        .first()
+    
+    @classmethod
+    def find_by_beneficiaria_with_parent(cls, beneficiaria_id):
+        """
+        Busca termo por beneficiária já com a beneficiária carregada.
+        
+        Um único LEFT OUTER JOIN; como beneficiaria_id é único, não há
+        duplicação de linhas. Use nas telas administrativas e relatórios
+        que exibem dados da beneficiária junto com o termo.
+        """
+        return cls.query.options(joinedload(cls.beneficiaria))\
+                        .filter_by(beneficiaria_id=beneficiaria_id)\
+                        .first()
+    
+    @classmethod
+    def iter_dicts(cls, **filters):
+        """
+        Serializa termos direto das linhas do banco, sem instanciar o ORM.
+        
+        Usa cursor no servidor em lotes de 500 linhas; responsável legal e
+        testemunhas entram na mesma consulta via LEFT JOIN.
+        
+        Args:
+            **filters: Igualdades sobre colunas de termos_consentimento
+            
+        Yields:
+            dict: Mesmo formato de to_dict()
+        """
+        termo = cls.__table__
+        responsavel = ResponsavelLegalTermo.__table__
+        testemunha1 = TestemunhaTermo.__table__.alias('testemunha1')
+        testemunha2 = TestemunhaTermo.__table__.alias('testemunha2')
+        
+        stmt = (
+            select(
+                termo,
+                responsavel.c.nome.label('nome_responsavel_legal'),
+                responsavel.c.cpf.label('cpf_responsavel_legal'),
+                responsavel.c.parentesco.label('parentesco_responsavel'),
+                testemunha1.c.nome.label('nome_testemunha1'),
+                testemunha1.c.cpf.label('cpf_testemunha1'),
+                testemunha2.c.nome.label('nome_testemunha2'),
+                testemunha2.c.cpf.label('cpf_testemunha2')
+            )
+            .select_from(
+                termo
+                .outerjoin(responsavel, responsavel.c.termo_id == termo.c.id)
+                .outerjoin(testemunha1, (testemunha1.c.termo_id == termo.c.id) & (testemunha1.c.ordem == 1))
+                .outerjoin(testemunha2, (testemunha2.c.termo_id == termo.c.id) & (testemunha2.c.ordem == 2))
+            )
+            .where(*(termo.c[campo] == valor for campo, valor in filters.items()))
+            .execution_options(yield_per=500, stream_results=True)
+        )
+        
+        for row in db.session.execute(stmt):
+            yield _row_to_dict(row._mapping)
     
     @classmethod
     def find_consentimentos_validos(cls):
@@ -343,12 +451,42 @@ class TermoConsentimento(db.Model):
         """Busca termos com consentimentos revogados."""
         return cls.query.filter_by(consentimento_revogado=True).all()
     
+    @classmethod
+    def bulk_revogar(cls, ids, motivo=None):
+        """
+        Revoga vários consentimentos com um único UPDATE.
+        
+        Args:
+            ids (list): IDs dos termos a revogar
+            motivo (str): Motivo da revogação
+            
+        Returns:
+            int: Quantidade de termos revogados
+        """
+        if not ids:
+            return 0
+        
+        stmt = (
+            update(cls)
+            .where(cls.id.in_(ids))
+            .values(
+                consentimento_revogado=True,
+                data_revogacao=func.now(),
+                motivo_revogacao=motivo
+            )
+        )
+        return db.session.execute(stmt).rowcount
+    
     def revogar_consentimento(self, motivo=None):
         """Revoga o consentimento."""
-        self.consentimento_revogado = True
-        self.data_revogacao = datetime.utcnow()
-        self.motivo_revogacao = motivo
-        self.atualizado_em = datetime.utcnow()
+        if not inspect(self).persistent:
+            # Termo ainda não gravado: não há linha para o UPDATE
+            self.consentimento_revogado = True
+            self.data_revogacao = datetime.utcnow()
+            self.motivo_revogacao = motivo
+            return
+        
+        type(self).bulk_revogar([self.id], motivo)
     
     def is_consentimento_valido(self):
         """Verifica se o consentimento ainda é válido."""
@@ -369,3 +507,98 @@ class TermoConsentimento(db.Model):
             return 'expirado'
         else:
             return 'ativo'
+
+
+TermoConsentimento.to_dict = build_serializer(
+    'TermoConsentimento', 'to_dict', 'self', 'self.{}', _TO_DICT_FIELDS
+)
+TermoConsentimento.to_dict.__doc__ = 'Converte o modelo para dicionário.'
+
+# Mesmo formato de to_dict, lendo de row._mapping (ver iter_dicts)
+_row_to_dict = build_serializer(
+    'TermoConsentimento', '_row_to_dict', 'row', 'row[{!r}]', _TO_DICT_FIELDS
+)
+
+
+class ResponsavelLegalTermo(db.Model):
+    """
+    Responsável legal que assina o termo de consentimento.
+    
+    Só existe para termos com tem_responsavel_legal = True.
+    """
+    
+    __tablename__ = 'responsavel_legal'
+    
+    termo_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('termos_consentimento.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID do termo de consentimento"
+    )
+    
+    nome = Column(
+        String(200),
+        nullable=True,
+        comment="Nome do responsável legal"
+    )
+    
+    cpf = Column(
+        String(14),
+        nullable=True,
+        comment="CPF do responsável legal"
+    )
+    
+    parentesco = Column(
+        String(100),
+        nullable=True,
+        comment="Grau de parentesco do responsável"
+    )
+    
+    termo = relationship(
+        "TermoConsentimento",
+        back_populates="responsavel_legal"
+    )
+    
+    def __repr__(self):
+        """Representação string do modelo."""
+        return f"<ResponsavelLegalTermo(termo_id={self.termo_id}, nome={self.nome})>"
+
+
+class TestemunhaTermo(db.Model):
+    """Testemunha do termo de consentimento (primeira ou segunda)."""
+    
+    __tablename__ = 'testemunhas_termo'
+    
+    termo_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('termos_consentimento.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID do termo de consentimento"
+    )
+    
+    ordem = Column(
+        Integer,
+        primary_key=True,
+        comment="Ordem da testemunha no termo (1 ou 2)"
+    )
+    
+    nome = Column(
+        String(200),
+        nullable=True,
+        comment="Nome da testemunha"
+    )
+    
+    cpf = Column(
+        String(14),
+        nullable=True,
+        comment="CPF da testemunha"
+    )
+    
+    termo = relationship(
+        "TermoConsentimento",
+        back_populates="testemunhas"
+    )
+    
+    def __repr__(self):
+        """Representação string do modelo."""
+        return f"<TestemunhaTermo(termo_id={self.termo_id}, ordem={self.ordem}, nome={self.nome})>"
@@ -6,14 +6,19 @@ incluindo profissionais e administradores.
 """
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, select, bindparam
 from flask_bcrypt import check_password_hash
+from argon2.exceptions import VerificationError, InvalidHashError
 
-from app.extensions import db, bcrypt
+from app.config import Config
+from app.extensions import db, bcrypt, password_hasher
+
+# Prefixo dos hashes bcrypt gravados antes da migração para argon2id
+_BCRYPT_PREFIX = '$2'
 
 
 class TipoUsuarioEnum(Enum):
@@ -109,6 +114,10 @@ class Usuario(db.Model):
     # Relacionamentos
     # TODO: Adicionar relacionamentos com formulários criados/modificados
     
+    # Limite de tentativas de login e duração do bloqueio
+    MAX_LOGIN_ATTEMPTS = getattr(Config, 'MAX_LOGIN_ATTEMPTS', 5)
+    LOGIN_BLOCK = timedelta(minutes=getattr(Config, 'LOGIN_ATTEMPT_TIMEOUT', 15))
+    
     def __init__(self, nome, email, senha, tipo_usuario=TipoUsuarioEnum.PROFISSIONAL):
         """
         Inicializar novo usuário.
@@ -131,19 +140,38 @@ class Usuario(db.Model):
         Args:
             senha (str): Senha em texto plano
         """
-        self.senha_hash = bcrypt.generate_password_hash(senha).decode('utf-8')
+        self.senha_hash = password_hasher.hash(senha)
     
     def check_password(self, senha):
         """
         Verificar se a senha está correta.
         
+        Aceita tanto hashes argon2id quanto hashes bcrypt legados.
+        
         Args:
             senha (str): Senha em texto plano para verificar
             
         Returns:
             bool: True se a senha estiver correta, False caso contrário
         """
-        return bcrypt.check_password_hash(self.senha_hash, senha)
+        if self.senha_hash.startswith(_BCRYPT_PREFIX):
+            return bcrypt.check_password_hash(self.senha_hash, senha)
+        
+        try:
+            return password_hasher.verify(self.senha_hash, senha)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def password_needs_rehash(self):
+        """
+        Verificar se o hash da senha deve ser regerado.
+        
+        Returns:
+            bool: True para hashes bcrypt legados ou argon2 com parâmetros antigos
+        """
+        if self.senha_hash.startswith(_BCRYPT_PREFIX):
+            return True
+        return password_hasher.check_needs_rehash(self.senha_hash)
     
     def is_admin(self):
         """
@@ -188,18 +216,16 @@ class Usuario(db.Model):
         self.tentativas_login += 1
         
         # Bloquear usuário após muitas tentativas
-        from app.config import Config
-        max_attempts = getattr(Config, 'MAX_LOGIN_ATTEMPTS', 5)
-        timeout_minutes = getattr(Config, 'LOGIN_ATTEMPT_TIMEOUT', 15)
-        
-        if self.tentativas_login >= max_attempts:
-            from datetime import timedelta
-            self.bloqueado_ate = datetime.utcnow() + timedelta(minutes=timeout_minutes)
+        if self.tentativas_login >= self.MAX_LOGIN_ATTEMPTS:
+            self.bloqueado_ate = datetime.utcnow() + self.LOGIN_BLOCK
     
     def reset_login_attempts(self):
         """Resetar contador de tentativas de login."""
-        self.tentativas_login = 0
-        self.bloqueado_ate = None
+        # Só atribuir quando houver mudança, para não incluir as colunas no UPDATE
+        if self.tentativas_login:
+            self.tentativas_login = 0
+        if self.bloqueado_ate is not None:
+            self.bloqueado_ate = None
         self.ultimo_login = datetime.utcnow()
     
     def to_dict(self, include_sensitive=False):
@@ -246,7 +272,24 @@ class Usuario(db.Model):
         Returns:
             Usuario: Usuário encontrado ou None
         """
-        return cls.query.filter_by(email=email.lower().strip()).first()
+        return db.session.execute(
+            _FIND_BY_EMAIL_STMT, {'email': email.lower().strip()}
+        ).scalar_one_or_none()
+    
+    @classmethod
+    def find_by_emails(cls, emails):
+        """
+        Buscar vários usuários por email em uma única consulta.
+        
+        Args:
+            emails (iterable): Emails dos usuários
+            
+        Returns:
+            dict: Usuários encontrados, indexados pelo email normalizado
+        """
+        emails = [email.lower().strip() for email in emails]
+        usuarios = db.session.scalars(_FIND_BY_EMAILS_STMT, {'emails': emails})
+        return {usuario.email: usuario for usuario in usuarios}
     
     @classmethod
     def find_by_id(cls, user_id):
@@ -265,7 +308,8 @@ class Usuario(db.Model):
             except ValueError:
                 return None
         
-        return cls.query.filter_by(id=user_id).first()
+        # Consulta o identity map da sessão antes de emitir o SELECT
+        return db.session.get(cls, user_id)
     
     @classmethod
     def get_active_users(cls):
@@ -275,7 +319,7 @@ class Usuario(db.Model):
         Returns:
             list: Lista de usuários ativos
         """
-        return cls.query.filter_by(ativo=True).all()
+        return db.session.scalars(_ACTIVE_USERS_STMT).all()
     
     @classmethod
     def get_admins(cls):
@@ -285,7 +329,7 @@ class Usuario(db.Model):
         Returns:
             list: Lista de administradores
         """
-        return cls.query.filter_by(tipo_usuario=TipoUsuarioEnum.ADMIN).all()
+        return db.session.scalars(_ADMINS_STMT).all()
     
     @classmethod
     def get_profissionais(cls):
@@ -295,4 +339,15 @@ class Usuario(db.Model):
         Returns:
             list: Lista de profissionais
         """
-        return cls.query.filter_by(tipo_usuario=TipoUsuarioEnum.PROFISSIONAL).all()
+        return db.session.scalars(_PROFISSIONAIS_STMT).all()
+
+
+# Consultas montadas uma única vez na importação, reaproveitando o SQL
+# compilado entre chamadas; o email é passado por parâmetro
+_FIND_BY_EMAIL_STMT = select(Usuario).where(Usuario.email == bindparam('email'))
+_FIND_BY_EMAILS_STMT = select(Usuario).where(
+    Usuario.email.in_(bindparam('emails', expanding=True))
+)
+_ACTIVE_USERS_STMT = select(Usuario).where(Usuario.ativo == True)
+_ADMINS_STMT = select(Usuario).where(Usuario.tipo_usuario == TipoUsuarioEnum.ADMIN)
+_PROFISSIONAIS_STMT = select(Usuario).where(Usuario.tipo_usuario == TipoUsuarioEnum.PROFISSIONAL)
@@ -6,7 +6,8 @@ incluindo aspectos físicos, emocionais, sociais, espirituais e familiares.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, select, bindparam, desc, text
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from enum import Enum
 from app.extensions import db
@@ -32,6 +33,88 @@ class NivelSituacao(Enum):
     EXCELENTE = "excelente"
 
 
+# Pontuação de cada nível no score geral (0 a 100)
+_SCORE_NIVEL = {
+    NivelSituacao.CRITICO: 0,
+    NivelSituacao.PREOCUPANTE: 25,
+    NivelSituacao.ESTAVEL: 50,
+    NivelSituacao.BOM: 75,
+    NivelSituacao.EXCELENTE: 100
+}
+
+# Níveis considerados positivos em get_aspectos_positivos
+_NIVEIS_POSITIVOS = frozenset((NivelSituacao.BOM, NivelSituacao.EXCELENTE))
+
+# Colunas de situação consideradas no score, na ordem das linhas de score_many
+_SITUACAO_COLUMNS = (
+    'situacao_fisica',
+    'situacao_emocional',
+    'situacao_social',
+    'situacao_espiritual',
+    'situacao_familiar',
+    'situacao_profissional',
+    'situacao_financeira'
+)
+
+
+def _calcular_score(niveis):
+    """
+    Calcular a média das pontuações dos níveis avaliados.
+    
+    Args:
+        niveis (iterable): Níveis de situação (None = não avaliado)
+        
+    Returns:
+        float: Score de 0 a 100, ou 0.0 se nada foi avaliado
+    """
+    pontos = [_SCORE_NIVEL[nivel] for nivel in niveis if nivel is not None]
+    
+    if not pontos:
+        return 0.0
+    
+    return round(sum(pontos) / len(pontos), 2)
+
+
+class NivelSituacaoType(TypeDecorator):
+    """
+    Coluna texto com o valor de NivelSituacao.
+    
+    Evita o tipo ENUM do Postgres e a validação por linha do SQLEnum;
+    a conversão na leitura é uma consulta a um dicionário pré-montado.
+    """
+    
+    impl = String(16)
+    cache_ok = True
+    
+    # Aceita o valor e também o nome do membro, que era o que o SQLEnum
+    # gravava nas linhas antigas
+    _MAP = {
+        **{nivel.name: nivel for nivel in NivelSituacao},
+        **{nivel.value: nivel for nivel in NivelSituacao}
+    }
+    
+    def process_bind_param(self, value, dialect):
+        """Converter NivelSituacao (ou seu valor) para texto."""
+        if value is None:
+            return None
+        return NivelSituacao(value).value
+    
+    def process_result_value(self, value, dialect):
+        """
+        Converter texto do banco para NivelSituacao.
+        
+        Raises:
+            ValueError: Se o texto não corresponder a nenhum nível
+        """
+        if value is None:
+            return None
+        
+        try:
+            return self._MAP[value]
+        except KeyError:
+            raise ValueError(f'Nível de situação desconhecido no banco: {value!r}')
+
+
 class VisaoHolistica(db.Model):
     """
     Modelo para avaliação holística da beneficiária.
@@ -42,6 +125,16 @@ class VisaoHolistica(db.Model):
     """
     
     __tablename__ = 'visao_holistica'
+    __table_args__ = (
+        # Avaliações ativas de uma beneficiária já ordenadas da mais recente
+        # (atende get_ultima_avaliacao e get_by_beneficiaria sem sort)
+        Index(
+            'ix_visao_holistica_beneficiaria_data',
+            'beneficiaria_id',
+            desc('data_avaliacao'),
+            postgresql_where=text('ativo')
+        ),
+    )
     
     # Chave primária
     id = Column(Integer, primary_key=True)
@@ -55,31 +148,31 @@ class VisaoHolistica(db.Model):
     profissional_responsavel = Column(String(255), nullable=False)
     
     # Aspectos físicos
-    situacao_fisica = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_fisica = Column(NivelSituacaoType, nullable=True)
     observacoes_fisica = Column(Text)
     
     # Aspectos emocionais
-    situacao_emocional = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_emocional = Column(NivelSituacaoType, nullable=True)
     observacoes_emocional = Column(Text)
     
     # Aspectos sociais
-    situacao_social = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_social = Column(NivelSituacaoType, nullable=True)
     observacoes_social = Column(Text)
     
     # Aspectos espirituais
-    situacao_espiritual = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_espiritual = Column(NivelSituacaoType, nullable=True)
     observacoes_espiritual = Column(Text)
     
     # Aspectos familiares
-    situacao_familiar = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_familiar = Column(NivelSituacaoType, nullable=True)
     observacoes_familiar = Column(Text)
     
     # Aspectos profissionais
-    situacao_profissional = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_profissional = Column(NivelSituacaoType, nullable=True)
     observacoes_profissional = Column(Text)
     
     # Aspectos financeiros
-    situacao_financeira = Column(SQLEnum(NivelSituacao), nullable=True)
+    situacao_financeira = Column(NivelSituacaoType, nullable=True)
     observacoes_financeira = Column(Text)
     
     # Avaliação geral
@@ -99,6 +192,31 @@ class VisaoHolistica(db.Model):
     atualizado_por = Column(String(255))
     ativo = Column(Boolean, nullable=False, default=True)
     
+    # Nome de cada aspecto e a coluna com a sua situação
+    _ASPECTOS = (
+        ('fisica', 'situacao_fisica'),
+        ('emocional', 'situacao_emocional'),
+        ('social', 'situacao_social'),
+        ('espiritual', 'situacao_espiritual'),
+        ('familiar', 'situacao_familiar'),
+        ('profissional', 'situacao_profissional'),
+        ('financeira', 'situacao_financeira')
+    )
+    
+    # Campos de to_dict, separados pela conversão que cada um recebe
+    _TO_DICT_PLAIN = (
+        'id', 'beneficiaria_id', 'profissional_responsavel',
+        'observacoes_fisica', 'observacoes_emocional', 'observacoes_social',
+        'observacoes_espiritual', 'observacoes_familiar',
+        'observacoes_profissional', 'observacoes_financeira',
+        'pontos_fortes', 'areas_melhoria', 'objetivos_principais',
+        'observacoes_gerais', 'proximas_acoes', 'ativo'
+    )
+    _TO_DICT_DT = (
+        'data_avaliacao', 'data_proxima_avaliacao', 'criado_em', 'atualizado_em'
+    )
+    _TO_DICT_ENUM = _SITUACAO_COLUMNS
+    
     def __init__(self, **kwargs):
         """Inicializar nova avaliação holística."""
         super().__init__(**kwargs)
@@ -114,35 +232,15 @@ class VisaoHolistica(db.Model):
         Returns:
             dict: Dados da avaliação holística
         """
-        return {
-            'id': self.id,
-            'beneficiaria_id': self.beneficiaria_id,
-            'data_avaliacao': self.data_avaliacao.isoformat() if self.data_avaliacao else None,
-            'profissional_responsavel': self.profissional_responsavel,
-            'situacao_fisica': self.situacao_fisica.value if self.situacao_fisica else None,
-            'observacoes_fisica': self.observacoes_fisica,
-            'situacao_emocional': self.situacao_emocional.value if self.situacao_emocional else None,
-            'observacoes_emocional': self.observacoes_emocional,
-            'situacao_social': self.situacao_social.value if self.situacao_social else None,
-            'observacoes_social': self.observacoes_social,
-            'situacao_espiritual': self.situacao_espiritual.value if self.situacao_espiritual else None,
-            'observacoes_espiritual': self.observacoes_espiritual,
-            'situacao_familiar': self.situacao_familiar.value if self.situacao_familiar else None,
-            'observacoes_familiar': self.observacoes_familiar,
-            'situacao_profissional': self.situacao_profissional.value if self.situacao_profissional else None,
-            'observacoes_profissional': self.observacoes_profissional,
-            'situacao_financeira': self.situacao_financeira.value if self.situacao_financeira else None,
-            'observacoes_financeira': self.observacoes_financeira,
-            'pontos_fortes': self.pontos_fortes,
-            'areas_melhoria': self.areas_melhoria,
-            'objetivos_principais': self.objetivos_principais,
-            'observacoes_gerais': self.observacoes_gerais,
-            'proximas_acoes': self.proximas_acoes,
-            'data_proxima_avaliacao': self.data_proxima_avaliacao.isoformat() if self.data_proxima_avaliacao else None,
-            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
-            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None,
-            'ativo': self.ativo
-        }
+        dados = {campo: getattr(self, campo) for campo in self._TO_DICT_PLAIN}
+        
+        for campo in self._TO_DICT_DT:
+            dados[campo] = (valor := getattr(self, campo)) and valor.isoformat()
+        
+        for campo in self._TO_DICT_ENUM:
+            dados[campo] = (valor := getattr(self, campo)) and valor.value
+        
+        return dados
     
     def calcular_score_geral(self):
         """
@@ -151,32 +249,21 @@ class VisaoHolistica(db.Model):
         Returns:
             float: Score de 0 a 100 baseado nas avaliações
         """
-        scores = {
-            NivelSituacao.CRITICO: 0,
-            NivelSituacao.PREOCUPANTE: 25,
-            NivelSituacao.ESTAVEL: 50,
-            NivelSituacao.BOM: 75,
-            NivelSituacao.EXCELENTE: 100
-        }
-        
-        aspectos = [
-            self.situacao_fisica,
-            self.situacao_emocional,
-            self.situacao_social,
-            self.situacao_espiritual,
-            self.situacao_familiar,
-            self.situacao_profissional,
-            self.situacao_financeira
-        ]
-        
-        # Filtrar aspectos avaliados
-        aspectos_avaliados = [a for a in aspectos if a is not None]
-        
-        if not aspectos_avaliados:
-            return 0.0
+        return _calcular_score(getattr(self, coluna) for coluna in _SITUACAO_COLUMNS)
+    
+    @classmethod
+    def score_many(cls, linhas):
+        """
+        Calcular o score geral de várias avaliações de uma vez.
         
-        total_score = sum(scores[aspecto] for aspecto in aspectos_avaliados)
-        return round(total_score / len(aspectos_avaliados), 2)
+        Args:
+            linhas (iterable): Tuplas com os níveis das colunas de situação,
+                na ordem de _SITUACAO_COLUMNS (ex.: linhas de um select)
+            
+        Returns:
+            list: Score de cada linha, na mesma ordem
+        """
+        return [_calcular_score(linha) for linha in linhas]
     
     def get_aspectos_criticos(self):
         """
@@ -185,23 +272,10 @@ class VisaoHolistica(db.Model):
         Returns:
             list: Lista de aspectos críticos
         """
-        aspectos_criticos = []
-        
-        aspectos_map = {
-            'fisica': self.situacao_fisica,
-            'emocional': self.situacao_emocional,
-            'social': self.situacao_social,
-            'espiritual': self.situacao_espiritual,
-            'familiar': self.situacao_familiar,
-            'profissional': self.situacao_profissional,
-            'financeira': self.situacao_financeira
-        }
-        
-        for nome, situacao in aspectos_map.items():
-            if situacao == NivelSituacao.CRITICO:
-                aspectos_criticos.append(nome)
-        
-        return aspectos_criticos
+        return [
+            nome for nome, coluna in self._ASPECTOS
+            if getattr(self, coluna) is NivelSituacao.CRITICO
+        ]
     
     def get_aspectos_positivos(self):
         """
@@ -210,23 +284,10 @@ class VisaoHolistica(db.Model):
         Returns:
             list: Lista de aspectos positivos
         """
-        aspectos_positivos = []
-        
-        aspectos_map = {
-            'fisica': self.situacao_fisica,
-            'emocional': self.situacao_emocional,
-            'social': self.situacao_social,
-            'espiritual': self.situacao_espiritual,
-            'familiar': self.situacao_familiar,
-            'profissional': self.situacao_profissional,
-            'financeira': self.situacao_financeira
-        }
-        
-        for nome, situacao in aspectos_map.items():
-            if situacao in [NivelSituacao.BOM, NivelSituacao.EXCELENTE]:
-                aspectos_positivos.append(nome)
-        
-        return aspectos_positivos
+        return [
+            nome for nome, coluna in self._ASPECTOS
+            if getattr(self, coluna) in _NIVEIS_POSITIVOS
+        ]
     
     @classmethod
     def get_by_beneficiaria(cls, beneficiaria_id, limit=None):
@@ -240,13 +301,13 @@ class VisaoHolistica(db.Model):
         Returns:
             list: Lista de avaliações holísticas
         """
-        query = cls.query.filter_by(beneficiaria_id=beneficiaria_id, ativo=True)\
-                        .order_by(cls.data_avaliacao.desc())
+        params = {'beneficiaria_id': beneficiaria_id}
         
         if limit:
-            query = query.limit(limit)
+            params['limit'] = limit
+            return db.session.scalars(_BY_BENEFICIARIA_LIMIT_STMT, params).all()
         
-        return query.all()
+        return db.session.scalars(_BY_BENEFICIARIA_STMT, params).all()
     
     @classmethod
     def get_ultima_avaliacao(cls, beneficiaria_id):
@@ -259,9 +320,28 @@ class VisaoHolistica(db.Model):
         Returns:
             VisaoHolistica: Última avaliação ou None
         """
-        return cls.query.filter_by(beneficiaria_id=beneficiaria_id, ativo=True)\
-                       .order_by(cls.data_avaliacao.desc())\
-                       .first()
+        return db.session.scalars(
+            _ULTIMA_AVALIACAO_STMT, {'beneficiaria_id': beneficiaria_id}
+        ).first()
+    
+    @classmethod
+    def get_scores_by_beneficiaria(cls, beneficiaria_id):
+        """
+        Obter o score geral de todas as avaliações de uma beneficiária.
+        
+        Lê apenas as colunas de situação, sem montar objetos do ORM.
+        
+        Args:
+            beneficiaria_id (int): ID da beneficiária
+            
+        Returns:
+            list: Tuplas (id, data_avaliacao, score), da mais recente à mais antiga
+        """
+        rows = db.session.execute(
+            _SCORES_BY_BENEFICIARIA_STMT, {'beneficiaria_id': beneficiaria_id}
+        ).all()
+        scores = cls.score_many(row[2:] for row in rows)
+        return [(row[0], row[1], score) for row, score in zip(rows, scores)]
     
     def validar_dados(self):
         """
@@ -287,3 +367,29 @@ class VisaoHolistica(db.Model):
             erros.append('Data da próxima avaliação deve ser posterior à atual')
         
         return erros
+
+
+# Consultas montadas uma única vez na importação; os filtros são passados por
+# parâmetro para que o SQL compilado seja reaproveitado entre chamadas
+_BY_BENEFICIARIA_STMT = (
+    select(VisaoHolistica)
+    .where(
+        VisaoHolistica.beneficiaria_id == bindparam('beneficiaria_id'),
+        VisaoHolistica.ativo == True
+    )
+    .order_by(VisaoHolistica.data_avaliacao.desc())
+)
+_BY_BENEFICIARIA_LIMIT_STMT = _BY_BENEFICIARIA_STMT.limit(bindparam('limit', type_=Integer))
+_ULTIMA_AVALIACAO_STMT = _BY_BENEFICIARIA_STMT.limit(1)
+_SCORES_BY_BENEFICIARIA_STMT = (
+    select(
+        VisaoHolistica.id,
+        VisaoHolistica.data_avaliacao,
+        *(getattr(VisaoHolistica, coluna) for coluna in _SITUACAO_COLUMNS)
+    )
+    .where(
+        VisaoHolistica.beneficiaria_id == bindparam('beneficiaria_id'),
+        VisaoHolistica.ativo == True
+    )
+    .order_by(VisaoHolistica.data_avaliacao.desc())
+)
@@ -11,11 +11,16 @@ from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     get_jwt_identity,
-    get_jwt
+    get_jwt,
+    current_user
 )
-from werkzeug.security import check_password_hash
+from argon2.exceptions import VerificationError
+from dataclasses import dataclass
 from datetime import timedelta
+import hmac
+import secrets
 
+from app.extensions import db, password_hasher
 from app.models.usuario import Usuario
 from app.schemas.usuario import (
     login_schema,
@@ -23,13 +28,64 @@ from app.schemas.usuario import (
     token_schema
 )
 from app.utils.error_handlers import handle_validation_error, handle_not_found
+from app.services.token_blocklist import revoke_token
+from app.services.last_login import queue_last_login_update
 from app.utils.logger import log_security_event
 
 # Criar blueprint para autenticação
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
-# Lista de tokens revogados (em produção usar Redis)
-revoked_tokens = set()
+# Hash de uma senha aleatória, verificado quando o email não existe para que
+# o tempo de resposta não revele quais usuários estão cadastrados
+DUMMY_HASH = password_hasher.hash(secrets.token_urlsafe(32))
+
+
+@dataclass(frozen=True)
+class AuthConfig:
+    """Validade dos tokens, lida da configuração uma vez por worker."""
+    
+    access_ttl: timedelta = timedelta(hours=24)
+    refresh_ttl: timedelta = timedelta(days=30)
+    
+    @classmethod
+    def from_app(cls, app):
+        """
+        Montar a configuração a partir da aplicação.
+        
+        Args:
+            app: Instância da aplicação Flask
+            
+        Returns:
+            AuthConfig: Configuração de autenticação
+        """
+        return cls(
+            access_ttl=app.config.get('JWT_ACCESS_TOKEN_EXPIRES', cls.access_ttl),
+            refresh_ttl=app.config.get('JWT_REFRESH_TOKEN_EXPIRES', cls.refresh_ttl)
+        )
+
+
+# Substituída por init_auth_config na criação da aplicação
+auth_config = AuthConfig()
+
+
+def init_auth_config(app):
+    """
+    Carregar a configuração de autenticação da aplicação.
+    
+    Args:
+        app: Instância da aplicação Flask
+    """
+    global auth_config
+    auth_config = AuthConfig.from_app(app)
+
+
+def _check_dummy_password(senha):
+    """Executar uma verificação de senha equivalente que sempre falha."""
+    try:
+        password_hasher.verify(DUMMY_HASH, senha)
+    except VerificationError:
+        pass
+    return False
 
 
 @auth_bp.route('/login', methods=['POST'])
@@ -46,7 +102,7 @@ def login():
     """
     try:
         # Validar dados de entrada
-        data = login_schema.load(request.json)
+        data = login_schema.load(request.get_data())
     except Exception as e:
         return handle_validation_error(e)
     
@@ -56,46 +112,52 @@ def login():
     # Buscar usuário pelo email
     usuario = Usuario.find_by_email(email)
     
-    if not usuario:
-        log_security_event('login_failed', {'email': email, 'reason': 'user_not_found'})
+    # A senha é sempre verificada (contra um hash fictício se o usuário não
+    # existir) e as condições são combinadas sem curto-circuito, para que
+    # todas as falhas levem o mesmo tempo e retornem a mesma mensagem
+    usuario_encontrado = usuario is not None
+    if usuario_encontrado:
+        senha_ok = usuario.check_password(senha)
+    else:
+        senha_ok = _check_dummy_password(senha)
+    usuario_ativo = usuario_encontrado and bool(usuario.ativo)
+    
+    if not (usuario_encontrado & usuario_ativo & senha_ok):
+        if not usuario_encontrado:
+            reason = 'user_not_found'
+        elif not usuario_ativo:
+            reason = 'user_inactive'
+        else:
+            reason = 'wrong_password'
+        log_security_event('login_failed', {'email': email, 'reason': reason})
         return jsonify({
             'success': False,
             'message': 'Email ou senha inválidos'
         }), 401
     
-    # Verificar se usuário está ativo
-    if not usuario.ativo:
-        log_security_event('login_failed', {'email': email, 'reason': 'user_inactive'})
-        return jsonify({
-            'success': False,
-            'message': 'Usuário inativo. Entre em contato com o administrador.'
-        }), 401
-    
-    # Verificar senha
-    if not usuario.check_password(senha):
-        log_security_event('login_failed', {'email': email, 'reason': 'wrong_password'})
-        return jsonify({
-            'success': False,
-            'message': 'Email ou senha inválidos'
-        }), 401
+    # Atualizar hashes bcrypt legados para argon2id
+    if usuario.password_needs_rehash():
+        usuario.set_password(senha)
+        db.session.commit()
     
     # Criar tokens
+    user_id = str(usuario.id)
     access_token = create_access_token(
-        identity=str(usuario.id),
-        expires_delta=timedelta(hours=current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', 24))
+        identity=user_id,
+        expires_delta=auth_config.access_ttl
     )
     
     refresh_token = create_refresh_token(
-        identity=str(usuario.id),
-        expires_delta=timedelta(days=current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 30))
+        identity=user_id,
+        expires_delta=auth_config.refresh_ttl
     )
     
-    # Atualizar último login
-    usuario.update_last_login()
+    # Registrar último login (gravado em lote pelo worker)
+    queue_last_login_update(user_id)
     
     # Log de sucesso
     log_security_event('login_success', {
-        'user_id': str(usuario.id),
+        'user_id': user_id,
         'email': email,
         'tipo_usuario': usuario.tipo_usuario.value
     })
@@ -124,17 +186,9 @@ def refresh():
     Returns:
         JSON: Novo token de acesso
     """
-    # Verificar se token foi revogado
-    jti = get_jwt()['jti']
-    if jti in revoked_tokens:
-        return jsonify({
-            'success': False,
-            'message': 'Token inválido'
-        }), 401
-    
     # Obter usuário atual
     current_user_id = get_jwt_identity()
-    usuario = Usuario.find_by_id(current_user_id)
+    usuario = current_user
     
     if not usuario or not usuario.ativo:
         return jsonify({
@@ -145,7 +199,7 @@ def refresh():
     # Criar novo token de acesso
     new_access_token = create_access_token(
         identity=current_user_id,
-        expires_delta=timedelta(hours=current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', 24))
+        expires_delta=auth_config.access_ttl
     )
     
     return jsonify({
@@ -171,8 +225,8 @@ def logout():
         JSON: Confirmação de logout
     """
     # Adicionar token à lista de revogados
-    jti = get_jwt()['jti']
-    revoked_tokens.add(jti)
+    token = get_jwt()
+    revoke_token(token['jti'], token['exp'])
     
     # Log de logout
     current_user_id = get_jwt_identity()
@@ -196,8 +250,7 @@ def get_current_user():
     Returns:
         JSON: Dados do usuário logado
     """
-    current_user_id = get_jwt_identity()
-    usuario = Usuario.find_by_id(current_user_id)
+    usuario = current_user
     
     if not usuario:
         return handle_not_found('Usuário não encontrado')
@@ -246,7 +299,7 @@ def change_password():
                 'message': 'Todos os campos são obrigatórios'
             }), 400
         
-        if nova_senha != confirmar_senha:
+        if not hmac.compare_digest(nova_senha.encode('utf-8'), confirmar_senha.encode('utf-8')):
             return jsonify({
                 'success': False,
                 'message': 'Nova senha e confirmação não coincidem'
@@ -260,7 +313,7 @@ def change_password():
         
         # Obter usuário atual
         current_user_id = get_jwt_identity()
-        usuario = Usuario.find_by_id(current_user_id)
+        usuario = current_user
         
         if not usuario:
             return handle_not_found('Usuário não encontrado')
@@ -313,21 +366,3 @@ def verify_token():
         }
     }), 200
 
-
-# Middleware para verificar tokens revogados
-@auth_bp.before_app_request
-def check_if_token_revoked():
-    """Verifica se o token foi revogado."""
-    if request.endpoint and 'auth' in request.endpoint:
-        return
-    
-    try:
-        jti = get_jwt().get('jti')
-        if jti in revoked_tokens:
-            return jsonify({
-                'success': False,
-                'message': 'Token foi revogado'
-            }), 401
-    except:
-        # Se não há JWT no request, ignora
-        pass
@@ -5,15 +5,198 @@ Este módulo define rotas para verificação de saúde da aplicação
 e monitoramento de status.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, current_app
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from datetime import datetime
+import threading
+import time
 import sys
 import os
 
+from sqlalchemy import text, select, func
+from sqlalchemy.exc import ProgrammingError
+
 from app.extensions import db
+from app.models.usuario import Usuario
+from app.models.beneficiaria import Beneficiaria
+from app.models.stats_counter import StatsCounter, CONTADORES_ATIVOS
 
 health_bp = Blueprint('health', __name__)
 
+# Tempo (segundos) após o qual o estado do banco é considerado desatualizado
+# e um probe verifica o banco na hora
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', 15))
+
+# Intervalo (segundos) entre verificações do banco em segundo plano
+DB_HEALTH_INTERVAL = float(os.getenv('DB_HEALTH_INTERVAL', 5))
+
+# Tempo máximo (segundos) de espera pelo ping do banco
+DB_PING_TIMEOUT = float(os.getenv('DB_PING_TIMEOUT', 1.0))
+
+# Um único worker e no máximo um ping em andamento: com o banco travado, as
+# verificações seguintes aguardam o mesmo ping em vez de enfileirar novos
+_ping_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-ping')
+_ping_future = None
+_ping_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class _DbHealth:
+    """Resultado da última verificação do banco (trocado inteiro a cada ping)."""
+    healthy: bool
+    error: str = None
+    checked_at: float = 0.0
+
+
+_db_health = _DbHealth(healthy=False)
+_db_health_lock = threading.Lock()
+
+# Informações do sistema que não mudam durante a execução
+_SYSTEM_INFO = {
+    'python_version': sys.version,
+    'platform': sys.platform
+}
+
+# Sem os contadores do PostgreSQL, as contagens de registros ativos são
+# recalculadas no máximo a cada 5 minutos
+METRICS_COUNT_TTL = 300
+_contagens_cache = {'expires_at': 0.0, 'valores': None}
+
+# As duas contagens como subconsultas escalares de um único SELECT
+_CONTAGENS_STMT = select(
+    select(func.count()).select_from(Usuario).where(Usuario.ativo)
+    .scalar_subquery().label('usuarios_ativos'),
+    select(func.count()).select_from(Beneficiaria).where(Beneficiaria.ativo)
+    .scalar_subquery().label('beneficiarias_ativas')
+)
+
+
+# Corpos fixos de /health e /live; só o timestamp (UTC, formato do orjson)
+# é inserido a cada requisição
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'Z","version":"1.0.0"}'
+_LIVE_PREFIX = b'{"status":"alive","timestamp":"'
+_LIVE_SUFFIX = b'Z"}'
+
+
+def _fixed_json(prefix, suffix):
+    """Montar resposta JSON de formato fixo com o timestamp atual."""
+    timestamp = datetime.utcnow().isoformat().encode('ascii')
+    return Response(prefix + timestamp + suffix, mimetype='application/json')
+
+
+def _ping_engine(engine, consulta):
+    """
+    Obter uma conexão do pool para verificar o banco.
+    
+    Com pool_pre_ping o próprio pool valida a conexão no checkout (e
+    descarta as mortas), então conseguir a conexão já prova que o banco
+    está acessível para os probes; o SELECT 1 só é executado quando
+    pedido ou quando o pre-ping não está configurado.
+    """
+    with engine.connect() as conn:
+        if consulta:
+            conn.scalar(text('SELECT 1'))
+
+
+def _ping_database(consulta=False):
+    """
+    Verificar o banco, desistindo após DB_PING_TIMEOUT segundos.
+    
+    Se um ping anterior ainda está em andamento (banco lento ou travado),
+    aguarda esse mesmo ping em vez de submeter outro.
+    
+    Args:
+        consulta (bool): Executar SELECT 1 mesmo com pool_pre_ping
+    
+    Raises:
+        TimeoutError: Se o banco não responder a tempo
+    """
+    global _ping_future
+    
+    engine_options = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    consulta = consulta or not engine_options.get('pool_pre_ping', False)
+    
+    with _ping_lock:
+        if _ping_future is None or _ping_future.done():
+            _ping_future = _ping_executor.submit(_ping_engine, db.engine, consulta)
+        future = _ping_future
+    
+    try:
+        future.result(timeout=DB_PING_TIMEOUT)
+    except FutureTimeoutError:
+        # O ping continua no executor e devolve a conexão ao pool ao terminar;
+        # até lá as próximas verificações reutilizam este mesmo future
+        raise TimeoutError(f'Banco de dados não respondeu em {DB_PING_TIMEOUT}s')
+
+
+def refresh_db_health():
+    """
+    Verificar o banco e publicar o resultado para os probes.
+    
+    Returns:
+        _DbHealth: Estado atualizado
+    """
+    global _db_health
+    
+    try:
+        _ping_database()
+        state = _DbHealth(healthy=True, checked_at=time.monotonic())
+    except Exception as e:
+        state = _DbHealth(healthy=False, error=str(e), checked_at=time.monotonic())
+    
+    _db_health = state
+    return state
+
+
+def _is_stale(state):
+    """Verificar se o estado do banco precisa ser atualizado."""
+    return not state.checked_at or time.monotonic() - state.checked_at > HEALTH_CACHE_TTL
+
+
+def _get_db_health():
+    """
+    Obter o estado do banco compartilhado entre os probes.
+    
+    Normalmente é o valor publicado pelo worker; se estiver desatualizado
+    (worker parado ou não iniciado), uma única requisição verifica o banco.
+    
+    Returns:
+        _DbHealth: Estado do banco
+    """
+    state = _db_health
+    
+    if _is_stale(state):
+        with _db_health_lock:
+            state = _db_health
+            if _is_stale(state):
+                state = refresh_db_health()
+    
+    return state
+
+
+def start_db_health_worker(app, interval=DB_HEALTH_INTERVAL):
+    """
+    Iniciar a thread que verifica o banco periodicamente.
+    
+    Args:
+        app: Instância da aplicação Flask
+        interval (float): Intervalo entre verificações, em segundos
+        
+    Returns:
+        threading.Thread: Thread do worker (daemon)
+    """
+    def run():
+        with app.app_context():
+            while True:
+                refresh_db_health()
+                time.sleep(interval)
+    
+    worker = threading.Thread(target=run, name='db-health-worker', daemon=True)
+    worker.start()
+    return worker
+
 
 @health_bp.route('/health', methods=['GET'])
 def health_check():
@@ -23,11 +206,7 @@ def health_check():
     Returns:
         JSON com status da aplicação
     """
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
-        'version': '1.0.0'
-    })
+    return _fixed_json(_HEALTH_PREFIX, _HEALTH_SUFFIX)
 
 
 @health_bp.route('/health/detailed', methods=['GET'])
@@ -38,28 +217,26 @@ def detailed_health_check():
     Returns:
         JSON com informações detalhadas da aplicação
     """
-    # Verificar status do banco de dados
-    db_status = 'healthy'
+    # Status do banco de dados: aqui é executado um SELECT 1 real, já que
+    # os probes apenas obtêm uma conexão do pool
     try:
-        # Executar query simples para testar conexão
-        db.session.execute('SELECT 1')
-        db.session.commit()
+        _ping_database(consulta=True)
+        db_healthy = True
+        db_status = 'healthy'
     except Exception as e:
+        db_healthy = False
         db_status = f'unhealthy: {str(e)}'
     
-    # Informações do sistema
-    system_info = {
-        'python_version': sys.version,
-        'platform': sys.platform,
-        'process_id': os.getpid()
-    }
+    # Informações do sistema (o PID é lido a cada vez: com preload do
+    # gunicorn o módulo é importado antes do fork dos workers)
+    system_info = {**_SYSTEM_INFO, 'process_id': os.getpid()}
     
     # Status geral
-    overall_status = 'healthy' if db_status == 'healthy' else 'unhealthy'
+    overall_status = 'healthy' if db_healthy else 'unhealthy'
     
     return jsonify({
         'status': overall_status,
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': datetime.utcnow(),
         'version': '1.0.0',
         'checks': {
             'database': db_status,
@@ -76,21 +253,20 @@ def readiness_check():
     Returns:
         JSON com status de prontidão da aplicação
     """
-    try:
-        # Verificar se o banco está acessível
-        db.session.execute('SELECT 1')
-        db.session.commit()
-        
+    # Verificar se o banco está acessível (última verificação compartilhada)
+    db_health = _get_db_health()
+    
+    if db_health.healthy:
         return jsonify({
             'status': 'ready',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         })
-    except Exception as e:
-        return jsonify({
-            'status': 'not ready',
-            'timestamp': datetime.utcnow().isoformat(),
-            'error': str(e)
-        }), 503
+    
+    return jsonify({
+        'status': 'not ready',
+        'timestamp': datetime.utcnow(),
+        'error': db_health.error
+    }), 503
 
 
 @health_bp.route('/live', methods=['GET'])
@@ -101,10 +277,61 @@ def liveness_check():
     Returns:
         JSON com status de vida da aplicação
     """
-    return jsonify({
-        'status': 'alive',
-        'timestamp': datetime.utcnow().isoformat()
-    })
+    return _fixed_json(_LIVE_PREFIX, _LIVE_SUFFIX)
+
+
+def _pool_stats():
+    """
+    Obter estatísticas do pool de conexões do banco.
+    
+    Returns:
+        dict: Conexões no pool, em uso, overflow e tamanho configurado
+    """
+    pool = db.engine.pool
+    
+    # Apenas pools com fila (QueuePool) expõem contadores
+    if not hasattr(pool, 'checkedout'):
+        return {'status': pool.status()}
+    
+    return {
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'size': pool.size()
+    }
+
+
+def _contagens_ativas():
+    """
+    Obter o número de usuários e beneficiárias ativos.
+    
+    No PostgreSQL lê os contadores mantidos por triggers (stats_counters).
+    Nos demais bancos (SQLite nos testes), ou em um PostgreSQL onde os
+    contadores ainda não foram instalados, conta as linhas em uma única
+    consulta, com cache de METRICS_COUNT_TTL.
+    
+    Returns:
+        dict: Contagens de registros ativos
+    """
+    if db.engine.dialect.name == 'postgresql':
+        try:
+            valores = StatsCounter.get_valores(CONTADORES_ATIVOS.values())
+        except ProgrammingError:
+            # Tabela stats_counters inexistente (banco criado antes dela)
+            db.session.rollback()
+            valores = {}
+        
+        # Contador ausente não significa zero: usar a contagem real
+        if len(valores) == len(CONTADORES_ATIVOS):
+            return valores
+    
+    agora = time.monotonic()
+    
+    if _contagens_cache['valores'] is None or agora >= _contagens_cache['expires_at']:
+        _contagens_cache['valores'] = db.session.execute(_CONTAGENS_STMT).one()._asdict()
+        _contagens_cache['expires_at'] = agora + METRICS_COUNT_TTL
+    
+    return _contagens_cache['valores']
 
 
 @health_bp.route('/metrics', methods=['GET'])
@@ -116,22 +343,15 @@ def metrics():
         JSON com métricas básicas da aplicação
     """
     try:
-        # Contar registros principais
-        from app.models.usuario import Usuario
-        from app.models.beneficiaria import Beneficiaria
-        
-        usuario_count = Usuario.query.filter_by(ativo=True).count()
-        beneficiaria_count = Beneficiaria.query.filter_by(ativo=True).count()
-        
         return jsonify({
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.utcnow(),
             'metrics': {
-                'usuarios_ativos': usuario_count,
-                'beneficiarias_ativas': beneficiaria_count
+                **_contagens_ativas(),
+                'db_pool': _pool_stats()
             }
         })
     except Exception as e:
         return jsonify({
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.utcnow(),
             'error': f'Erro ao obter métricas: {str(e)}'
         }), 500
@@ -3,4 +3,8 @@ Schemas de serialização/desserialização.
 
 Este pacote contém todos os schemas Marshmallow para validação
 e serialização de dados.
+
+Cada módulo exporta (via __all__) instâncias prontas dos schemas, como
+usuario_schema e usuarios_schema. Use-as em vez de instanciar as classes
+nas rotas: a montagem dos campos acontece uma vez, na importação.
 """
@@ -5,8 +5,32 @@ Este módulo contém o schema base que deve ser herdado por todos
 os outros schemas para garantir consistência.
 """
 
-from marshmallow import Schema, fields, post_load
+from marshmallow import Schema, fields
+from flask import g, has_request_context
 from datetime import datetime
+import re
+
+# Formato canônico de UUID (8-4-4-4-12 dígitos hexadecimais)
+_UUID_RE = re.compile(
+    r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$',
+    re.IGNORECASE
+)
+
+
+def data_hoje():
+    """
+    Obter a data atual, calculada uma única vez por requisição.
+    
+    Returns:
+        date: Data de hoje (guardada em g durante a requisição)
+    """
+    if not has_request_context():
+        return datetime.now().date()
+    
+    hoje = g.get('_data_hoje')
+    if hoje is None:
+        hoje = g._data_hoje = datetime.now().date()
+    return hoje
 
 
 class BaseSchema(Schema):
@@ -34,12 +58,46 @@ class BaseSchema(Schema):
         # Formato de data padrão
         dateformat = '%Y-%m-%d'
         datetimeformat = 'iso'
+
+
+def como_texto(valor):
+    """Converter valor para string preservando None (como fields.String)."""
+    return None if valor is None else str(valor)
+
+
+def formatar_data(valor, formato):
+    """
+    Formatar data, hora ou datetime preservando None.
+    
+    Args:
+        valor (date|time|datetime): Valor a formatar
+        formato (str): Formato strftime, ou 'iso' para ISO 8601
+        
+    Returns:
+        str: Valor formatado (None se o valor for None)
+    """
+    if valor is None:
+        return None
+    if formato == 'iso':
+        return valor.isoformat()
+    return valor.strftime(formato)
+
+
+class FastUUID(fields.String):
+    """
+    Campo UUID validado por expressão regular.
     
-    @post_load
-    def make_object(self, data, **kwargs):
-        """Hook executado após carregamento dos dados."""
-        # Remove valores None dos dados
-        return {k: v for k, v in data.items() if v is not None}
+    Mantém o valor como string em vez de construir um uuid.UUID; os
+    modelos aceitam a forma textual diretamente.
+    """
+    
+    default_error_messages = {'invalid': 'UUID inválido'}
+    
+    def _deserialize(self, value, attr, data, **kwargs):
+        """Validar o formato do UUID e retornar a string."""
+        if not isinstance(value, str) or not _UUID_RE.match(value):
+            raise self.make_error('invalid')
+        return value
 
 
 class PaginationSchema(Schema):
@@ -150,3 +208,15 @@ class ErrorSchema(Schema):
 response_schema = ResponseSchema()
 error_schema = ErrorSchema()
 pagination_schema = PaginationSchema()
+
+# Exportar as classes base (para herança) e as instâncias reutilizáveis
+__all__ = [
+    'BaseSchema',
+    'FastUUID',
+    'como_texto',
+    'formatar_data',
+    'data_hoje',
+    'response_schema',
+    'error_schema',
+    'pagination_schema'
+]
@@ -6,19 +6,25 @@ serialização dos dados de declaração de comparecimento.
 """
 
 from marshmallow import Schema, fields, validate, validates_schema, ValidationError
-from datetime import datetime, time
+from datetime import time
 
-from app.schemas.base import BaseSchema
+from app.schemas.base import (
+    BaseSchema,
+    FastUUID,
+    como_texto,
+    data_hoje,
+    formatar_data
+)
 
 
 class DeclaracaoComparecimentoSchema(BaseSchema):
     """Schema para Declaração de Comparecimento."""
     
     # Identificação
-    id = fields.UUID(dump_only=True, description="ID único da declaração")
+    id = FastUUID(dump_only=True, description="ID único da declaração")
     
     # Relacionamentos
-    beneficiaria_id = fields.UUID(
+    beneficiaria_id = FastUUID(
         required=True,
         description="ID da beneficiária",
         error_messages={
@@ -84,28 +90,26 @@ class DeclaracaoComparecimentoSchema(BaseSchema):
     atualizado_em = fields.DateTime(dump_only=True, format='iso')
     
     @validates_schema
-    def validate_horarios(self, data, **kwargs):
-        """Valida se horário de saída é posterior ao de entrada."""
+    def validate_campos(self, data, **kwargs):
+        """
+        Validar regras entre campos em uma única passada.
+        
+        - Horário de saída deve ser posterior ao de entrada
+        - Data de comparecimento não pode ser futura
+        """
+        erros = {}
+        
         hora_entrada = data.get('hora_entrada')
         hora_saida = data.get('hora_saida')
+        if hora_entrada and hora_saida and hora_saida <= hora_entrada:
+            erros['hora_saida'] = ['Horário de saída deve ser posterior ao de entrada']
         
-        if hora_entrada and hora_saida:
-            if hora_saida <= hora_entrada:
-                raise ValidationError(
-                    'Horário de saída deve ser posterior ao de entrada',
-                    field_name='hora_saida'
-                )
-    
-    @validates_schema
-    def validate_data_comparecimento(self, data, **kwargs):
-        """Valida se a data de comparecimento não é futura."""
         data_comparecimento = data.get('data_comparecimento')
+        if data_comparecimento and data_comparecimento.date() > data_hoje():
+            erros['data_comparecimento'] = ['Data de comparecimento não pode ser futura']
         
-        if data_comparecimento and data_comparecimento.date() > datetime.now().date():
-            raise ValidationError(
-                'Data de comparecimento não pode ser futura',
-                field_name='data_comparecimento'
-            )
+        if erros:
+            raise ValidationError(erros)
 
 
 class DeclaracaoComparecimentoCreateSchema(DeclaracaoComparecimentoSchema):
@@ -115,57 +119,63 @@ class DeclaracaoComparecimentoCreateSchema(DeclaracaoComparecimentoSchema):
         exclude = ('id', 'criado_em', 'atualizado_em')
 
 
-class DeclaracaoComparecimentoUpdateSchema(DeclaracaoComparecimentoSchema):
-    """Schema para atualização de declaração de comparecimento."""
-    
-    # Todos os campos são opcionais na atualização
-    beneficiaria_id = fields.UUID(allow_none=True)
-    data_comparecimento = fields.DateTime(allow_none=True, format='%Y-%m-%d')
-    profissional_responsavel = fields.String(
-        allow_none=True,
-        validate=validate.Length(min=2, max=200)
-    )
+def dump_declaracao_list_row(row):
+    """
+    Serializar uma linha da listagem de declarações de comparecimento.
     
-    class Meta:
-        exclude = ('id', 'criado_em', 'atualizado_em')
-
-
-class DeclaracaoComparecimentoListSchema(Schema):
-    """Schema para listagem de declarações de comparecimento."""
-    
-    id = fields.UUID(description="ID único da declaração")
-    beneficiaria_id = fields.UUID(description="ID da beneficiária")
-    beneficiaria_nome = fields.String(description="Nome da beneficiária")
-    data_comparecimento = fields.DateTime(format='%Y-%m-%d')
-    hora_entrada = fields.Time(format='%H:%M', allow_none=True)
-    hora_saida = fields.Time(format='%H:%M', allow_none=True)
-    profissional_responsavel = fields.String()
-    tipo_atendimento = fields.String(allow_none=True)
-    criado_em = fields.DateTime(format='iso')
+    Args:
+        row: Linha da consulta (Row ou modelo) com os campos da listagem
+        
+    Returns:
+        dict: Dados da declaração prontos para JSON
+    """
+    return {
+        'id': como_texto(row.id),
+        'beneficiaria_id': como_texto(row.beneficiaria_id),
+        'beneficiaria_nome': row.beneficiaria_nome,
+        'data_comparecimento': formatar_data(row.data_comparecimento, '%Y-%m-%d'),
+        'hora_entrada': formatar_data(row.hora_entrada, '%H:%M'),
+        'hora_saida': formatar_data(row.hora_saida, '%H:%M'),
+        'profissional_responsavel': row.profissional_responsavel,
+        'tipo_atendimento': row.tipo_atendimento,
+        'criado_em': formatar_data(row.criado_em, 'iso')
+    }
 
 
-class DeclaracaoComparecimentoReportSchema(Schema):
-    """Schema para relatórios de declarações de comparecimento."""
-    
-    # Dados da beneficiária
-    beneficiaria_nome = fields.String()
-    beneficiaria_cpf = fields.String()
+def dump_declaracao_report_row(row):
+    """
+    Serializar uma linha do relatório de declarações de comparecimento.
     
-    # Dados da declaração
-    data_comparecimento = fields.DateTime(format='%d/%m/%Y')
-    hora_entrada = fields.Time(format='%H:%M', allow_none=True)
-    hora_saida = fields.Time(format='%H:%M', allow_none=True)
-    profissional_responsavel = fields.String()
-    tipo_atendimento = fields.String(allow_none=True)
-    observacoes = fields.String(allow_none=True)
-    
-    # Auditoria
-    criado_em = fields.DateTime(format='%d/%m/%Y %H:%M')
+    Args:
+        row: Linha da consulta com dados da declaração e da beneficiária
+        
+    Returns:
+        dict: Dados do relatório prontos para JSON
+    """
+    return {
+        'beneficiaria_nome': row.beneficiaria_nome,
+        'beneficiaria_cpf': row.beneficiaria_cpf,
+        'data_comparecimento': formatar_data(row.data_comparecimento, '%d/%m/%Y'),
+        'hora_entrada': formatar_data(row.hora_entrada, '%H:%M'),
+        'hora_saida': formatar_data(row.hora_saida, '%H:%M'),
+        'profissional_responsavel': row.profissional_responsavel,
+        'tipo_atendimento': row.tipo_atendimento,
+        'observacoes': row.observacoes,
+        'criado_em': formatar_data(row.criado_em, '%d/%m/%Y %H:%M')
+    }
 
 
 # Instâncias dos schemas para uso nas rotas
 declaracao_comparecimento_schema = DeclaracaoComparecimentoSchema()
 declaracao_comparecimento_create_schema = DeclaracaoComparecimentoCreateSchema()
-declaracao_comparecimento_update_schema = DeclaracaoComparecimentoUpdateSchema()
-declaracao_comparecimento_list_schema = DeclaracaoComparecimentoListSchema(many=True)
-declaracao_comparecimento_report_schema = DeclaracaoComparecimentoReportSchema(many=True)
+# Atualização: mesmo schema com todos os campos opcionais
+declaracao_comparecimento_update_schema = DeclaracaoComparecimentoSchema(partial=True)
+
+# Exportar as instâncias reutilizáveis e as funções de listagem
+__all__ = [
+    'declaracao_comparecimento_schema',
+    'declaracao_comparecimento_create_schema',
+    'declaracao_comparecimento_update_schema',
+    'dump_declaracao_list_row',
+    'dump_declaracao_report_row'
+]
@@ -6,20 +6,28 @@ serialização dos dados de recibos de benefício.
 """
 
 from marshmallow import Schema, fields, validate, validates_schema, ValidationError
-from datetime import datetime
 from decimal import Decimal
 
-from app.schemas.base import BaseSchema
+from app.schemas.base import (
+    BaseSchema,
+    FastUUID,
+    como_texto,
+    data_hoje,
+    formatar_data
+)
+
+# Precisão dos valores monetários nas listagens
+_DUAS_CASAS = Decimal('0.01')
 
 
 class ReciboBeneficioSchema(BaseSchema):
     """Schema para Recibo de Benefício."""
     
     # Identificação
-    id = fields.UUID(dump_only=True, description="ID único do recibo")
+    id = FastUUID(dump_only=True, description="ID único do recibo")
     
     # Relacionamentos
-    beneficiaria_id = fields.UUID(
+    beneficiaria_id = FastUUID(
         required=True,
         description="ID da beneficiária",
         error_messages={
@@ -111,26 +119,26 @@ class ReciboBeneficioSchema(BaseSchema):
     atualizado_em = fields.DateTime(dump_only=True, format='iso')
     
     @validates_schema
-    def validate_data_recebimento(self, data, **kwargs):
-        """Valida se a data de recebimento não é futura."""
-        data_recebimento = data.get('data_recebimento')
+    def validate_campos(self, data, **kwargs):
+        """
+        Validar regras entre campos em uma única passada.
         
-        if data_recebimento and data_recebimento.date() > datetime.now().date():
-            raise ValidationError(
-                'Data de recebimento não pode ser futura',
-                field_name='data_recebimento'
-            )
-    
-    @validates_schema
-    def validate_valor_quantidade(self, data, **kwargs):
-        """Valida se pelo menos valor ou quantidade foi informado."""
-        valor = data.get('valor_beneficio')
-        quantidade = data.get('quantidade')
+        - Data de recebimento não pode ser futura
+        - Pelo menos valor ou quantidade deve ser informado
+        """
+        erros = {}
+        
+        data_recebimento = data.get('data_recebimento')
+        if data_recebimento and data_recebimento.date() > data_hoje():
+            erros['data_recebimento'] = ['Data de recebimento não pode ser futura']
         
-        if not valor and not quantidade:
-            raise ValidationError(
+        if not data.get('valor_beneficio') and not data.get('quantidade'):
+            erros['_schema'] = [
                 'É necessário informar pelo menos o valor ou a quantidade do benefício'
-            )
+            ]
+        
+        if erros:
+            raise ValidationError(erros)
 
 
 class ReciboBeneficioCreateSchema(ReciboBeneficioSchema):
@@ -140,62 +148,61 @@ class ReciboBeneficioCreateSchema(ReciboBeneficioSchema):
         exclude = ('id', 'numero_recibo', 'criado_em', 'atualizado_em')
 
 
-class ReciboBeneficioUpdateSchema(ReciboBeneficioSchema):
-    """Schema para atualização de recibo de benefício."""
-    
-    # Todos os campos são opcionais na atualização
-    beneficiaria_id = fields.UUID(allow_none=True)
-    tipo_beneficio = fields.String(
-        allow_none=True,
-        validate=validate.Length(min=2, max=200)
-    )
-    data_recebimento = fields.DateTime(allow_none=True, format='%Y-%m-%d')
-    responsavel_entrega = fields.String(
-        allow_none=True,
-        validate=validate.Length(min=2, max=200)
-    )
-    
-    class Meta:
-        exclude = ('id', 'numero_recibo', 'criado_em', 'atualizado_em')
+def _valor_monetario(valor):
+    """Arredondar valor para duas casas decimais (None se ausente)."""
+    return None if valor is None else Decimal(valor).quantize(_DUAS_CASAS)
 
 
-class ReciboBeneficioListSchema(Schema):
-    """Schema para listagem de recibos de benefício."""
-    
-    id = fields.UUID(description="ID único do recibo")
-    beneficiaria_id = fields.UUID(description="ID da beneficiária")
-    beneficiaria_nome = fields.String(description="Nome da beneficiária")
-    tipo_beneficio = fields.String()
-    valor_beneficio = fields.Decimal(places=2, allow_none=True)
-    quantidade = fields.String(allow_none=True)
-    data_recebimento = fields.DateTime(format='%Y-%m-%d')
-    responsavel_entrega = fields.String()
-    status = fields.String()
-    numero_recibo = fields.String(allow_none=True)
-    criado_em = fields.DateTime(format='iso')
-
-
-class ReciboBeneficioReportSchema(Schema):
-    """Schema para relatórios de recibos de benefício."""
-    
-    # Dados da beneficiária
-    beneficiaria_nome = fields.String()
-    beneficiaria_cpf = fields.String()
-    
-    # Dados do recibo
-    numero_recibo = fields.String(allow_none=True)
-    tipo_beneficio = fields.String()
-    descricao_beneficio = fields.String(allow_none=True)
-    valor_beneficio = fields.Decimal(places=2, allow_none=True)
-    quantidade = fields.String(allow_none=True)
-    data_recebimento = fields.DateTime(format='%d/%m/%Y')
-    origem_beneficio = fields.String(allow_none=True)
-    responsavel_entrega = fields.String()
-    status = fields.String()
-    observacoes = fields.String(allow_none=True)
+def dump_recibo_list_row(row):
+    """
+    Serializar uma linha da listagem de recibos de benefício.
     
-    # Auditoria
-    criado_em = fields.DateTime(format='%d/%m/%Y %H:%M')
+    Args:
+        row: Linha da consulta (Row ou modelo) com os campos da listagem
+        
+    Returns:
+        dict: Dados do recibo prontos para JSON
+    """
+    return {
+        'id': como_texto(row.id),
+        'beneficiaria_id': como_texto(row.beneficiaria_id),
+        'beneficiaria_nome': row.beneficiaria_nome,
+        'tipo_beneficio': row.tipo_beneficio,
+        'valor_beneficio': _valor_monetario(row.valor_beneficio),
+        'quantidade': row.quantidade,
+        'data_recebimento': formatar_data(row.data_recebimento, '%Y-%m-%d'),
+        'responsavel_entrega': row.responsavel_entrega,
+        'status': row.status,
+        'numero_recibo': row.numero_recibo,
+        'criado_em': formatar_data(row.criado_em, 'iso')
+    }
+
+
+def dump_recibo_report_row(row):
+    """
+    Serializar uma linha do relatório de recibos de benefício.
+    
+    Args:
+        row: Linha da consulta com dados do recibo e da beneficiária
+        
+    Returns:
+        dict: Dados do relatório prontos para JSON
+    """
+    return {
+        'beneficiaria_nome': row.beneficiaria_nome,
+        'beneficiaria_cpf': row.beneficiaria_cpf,
+        'numero_recibo': row.numero_recibo,
+        'tipo_beneficio': row.tipo_beneficio,
+        'descricao_beneficio': row.descricao_beneficio,
+        'valor_beneficio': _valor_monetario(row.valor_beneficio),
+        'quantidade': row.quantidade,
+        'data_recebimento': formatar_data(row.data_recebimento, '%d/%m/%Y'),
+        'origem_beneficio': row.origem_beneficio,
+        'responsavel_entrega': row.responsavel_entrega,
+        'status': row.status,
+        'observacoes': row.observacoes,
+        'criado_em': formatar_data(row.criado_em, '%d/%m/%Y %H:%M')
+    }
 
 
 class ReciboBeneficioStatisticsSchema(Schema):
@@ -211,7 +218,16 @@ class ReciboBeneficioStatisticsSchema(Schema):
 # Instâncias dos schemas para uso nas rotas
 recibo_beneficio_schema = ReciboBeneficioSchema()
 recibo_beneficio_create_schema = ReciboBeneficioCreateSchema()
-recibo_beneficio_update_schema = ReciboBeneficioUpdateSchema()
-recibo_beneficio_list_schema = ReciboBeneficioListSchema(many=True)
-recibo_beneficio_report_schema = ReciboBeneficioReportSchema(many=True)
+# Atualização: mesmo schema com todos os campos opcionais
+recibo_beneficio_update_schema = ReciboBeneficioSchema(partial=True)
 recibo_beneficio_statistics_schema = ReciboBeneficioStatisticsSchema()
+
+# Exportar as instâncias reutilizáveis e as funções de listagem
+__all__ = [
+    'recibo_beneficio_schema',
+    'recibo_beneficio_create_schema',
+    'recibo_beneficio_update_schema',
+    'recibo_beneficio_statistics_schema',
+    'dump_recibo_list_row',
+    'dump_recibo_report_row'
+]
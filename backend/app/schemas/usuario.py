@@ -5,15 +5,18 @@ Este módulo contém os schemas Marshmallow para validação e
 serialização dos dados de usuários.
 """
 
+from typing import Annotated
+
+import msgspec
 from marshmallow import Schema, fields, validate, validates_schema, ValidationError
 from app.models.usuario import TipoUsuarioEnum
-from app.schemas.base import BaseSchema
+from app.schemas.base import BaseSchema, FastUUID
 
 
 class UsuarioSchema(BaseSchema):
     """Schema principal para usuário."""
     
-    id = fields.UUID(dump_only=True, description="ID único do usuário")
+    id = FastUUID(dump_only=True, description="ID único do usuário")
     
     nome = fields.String(
         required=True,
@@ -54,25 +57,62 @@ class UsuarioSchema(BaseSchema):
     atualizado_em = fields.DateTime(dump_only=True, format='iso')
 
 
-class LoginSchema(Schema):
-    """Schema para login de usuário."""
+# Formato mínimo de email aceito no login
+_EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+
+class LoginIn(msgspec.Struct):
+    """Dados de login, validados pelo msgspec (caminho crítico da autenticação)."""
     
-    email = fields.Email(
-        required=True,
-        description="Email do usuário",
-        error_messages={
-            'required': 'Email é obrigatório',
-            'invalid': 'Email deve ter um formato válido'
-        }
-    )
+    email: Annotated[str, msgspec.Meta(pattern=_EMAIL_PATTERN, max_length=255)]
+    senha: Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class _LoginLoader:
+    """
+    Carregador dos dados de login com a mesma interface de LoginSchema.
     
-    senha = fields.String(
-        required=True,
-        description="Senha do usuário",
-        error_messages={
-            'required': 'Senha é obrigatória'
-        }
-    )
+    Decodifica e valida o corpo da requisição direto para LoginIn, sem
+    passar pelo dicionário intermediário e pelos campos do Marshmallow.
+    """
+    
+    _decoder = msgspec.json.Decoder(LoginIn)
+    
+    def load(self, data):
+        """
+        Validar dados de login.
+        
+        Args:
+            data (bytes|str|dict): Corpo JSON da requisição ou dados já decodificados
+            
+        Returns:
+            dict: Dados validados (email e senha)
+            
+        Raises:
+            ValidationError: Se os dados forem inválidos
+        """
+        try:
+            if isinstance(data, (bytes, str)):
+                login = self._decoder.decode(data)
+            else:
+                login = msgspec.convert(data, LoginIn)
+        except msgspec.ValidationError as e:
+            raise ValidationError(_login_error_messages(str(e)))
+        except msgspec.DecodeError:
+            raise ValidationError({'_schema': ['JSON inválido']})
+        
+        return {'email': login.email, 'senha': login.senha}
+
+
+def _login_error_messages(erro):
+    """Traduzir um erro do msgspec para as mensagens do antigo LoginSchema."""
+    if 'email' in erro:
+        if 'missing required field' in erro:
+            return {'email': ['Email é obrigatório']}
+        return {'email': ['Email deve ter um formato válido']}
+    if 'senha' in erro:
+        return {'senha': ['Senha é obrigatória']}
+    return {'_schema': ['Dados de login devem ser um objeto JSON']}
 
 
 class TokenSchema(Schema):
@@ -91,24 +131,22 @@ class UsuarioCreateSchema(UsuarioSchema):
         exclude = ('id', 'ultimo_login', 'criado_em', 'atualizado_em')
 
 
-class UsuarioUpdateSchema(UsuarioSchema):
-    """Schema para atualização de usuário."""
-    
-    # Todos os campos são opcionais na atualização
-    nome = fields.String(allow_none=True, validate=validate.Length(min=2, max=200))
-    email = fields.Email(allow_none=True)
-    senha = fields.String(load_only=True, allow_none=True, validate=validate.Length(min=6))
-    tipo_usuario = fields.Enum(TipoUsuarioEnum, allow_none=True)
-    ativo = fields.Boolean(allow_none=True)
-    
-    class Meta:
-        exclude = ('id', 'ultimo_login', 'criado_em', 'atualizado_em')
-
-
 # Instâncias dos schemas
 usuario_schema = UsuarioSchema()
 usuarios_schema = UsuarioSchema(many=True)
 usuario_create_schema = UsuarioCreateSchema()
-usuario_update_schema = UsuarioUpdateSchema()
-login_schema = LoginSchema()
+# Atualização: mesmo schema com todos os campos opcionais
+usuario_update_schema = UsuarioSchema(partial=True)
+login_schema = _LoginLoader()
 token_schema = TokenSchema()
+
+# Exportar apenas as instâncias reutilizáveis
+__all__ = [
+    'LoginIn',
+    'usuario_schema',
+    'usuarios_schema',
+    'usuario_create_schema',
+    'usuario_update_schema',
+    'login_schema',
+    'token_schema'
+]
@@ -0,0 +1,138 @@
+"""
+Gravação adiada do último login dos usuários.
+
+O login apenas registra o horário em um hash do Redis (um campo por
+usuário, de modo que logins repetidos se sobrescrevem) e um worker em
+segundo plano grava todos os pendentes periodicamente com um único UPDATE.
+
+O worker é iniciado no primeiro login registrado no processo, então
+comandos CLI e o seed, que não fazem login, não o iniciam.
+"""
+
+import atexit
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import case, update
+
+from app.extensions import db, redis_client
+from app.utils.logger import log_error
+
+# Hash do Redis com os logins pendentes (user_id -> timestamp ISO)
+PENDING_KEY = 'usuarios:ultimo_login:pendentes'
+
+# Worker único por processo, iniciado sob demanda
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def queue_last_login_update(user_id, quando=None):
+    """
+    Registrar o último login de um usuário para gravação posterior.
+
+    Falhas do Redis são registradas e ignoradas: perder o horário do último
+    login não pode impedir a autenticação.
+
+    Args:
+        user_id (str|UUID): ID do usuário
+        quando (datetime): Data e hora do login (padrão: agora)
+    """
+    quando = quando or datetime.utcnow()
+    try:
+        redis_client.hset(PENDING_KEY, str(user_id), quando.isoformat())
+    except RedisError as e:
+        log_error(e, context={'operacao': 'registrar último login'}, user_id=str(user_id))
+        return
+
+    interval = current_app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 0)
+    if interval:
+        start_last_login_worker(current_app._get_current_object(), interval)
+
+
+def flush_last_login_updates():
+    """
+    Gravar no banco todos os logins pendentes em um único UPDATE.
+
+    Returns:
+        int: Número de usuários atualizados
+    """
+    from app.models.usuario import Usuario
+
+    # Ler e remover os pendentes atomicamente, para que logins registrados
+    # durante a gravação fiquem para a próxima execução
+    pipe = redis_client.pipeline()
+    pipe.hgetall(PENDING_KEY)
+    pipe.delete(PENDING_KEY)
+    pendentes, _ = pipe.execute()
+
+    if not pendentes:
+        return 0
+
+    horarios = {
+        uuid.UUID(user_id.decode() if isinstance(user_id, bytes) else user_id):
+            datetime.fromisoformat(quando.decode() if isinstance(quando, bytes) else quando)
+        for user_id, quando in pendentes.items()
+    }
+
+    stmt = (
+        update(Usuario)
+        .where(Usuario.id.in_(horarios))
+        .values(ultimo_login=case(horarios, value=Usuario.id))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.session.execute(stmt)
+    db.session.commit()
+    return result.rowcount
+
+
+def _flush_at_exit(app):
+    """Gravar os logins ainda pendentes ao encerrar o processo."""
+    with app.app_context():
+        try:
+            flush_last_login_updates()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error("Erro ao gravar últimos logins no encerramento: %s", e)
+
+
+def start_last_login_worker(app, interval):
+    """
+    Iniciar a thread que grava os logins pendentes a cada intervalo.
+
+    Só inicia uma thread por processo; chamadas seguintes devolvem a mesma.
+    Os pendentes também são gravados ao encerrar o processo.
+
+    Args:
+        app: Instância da aplicação Flask
+        interval (int): Intervalo entre gravações, em segundos
+
+    Returns:
+        threading.Thread: Thread do worker (daemon)
+    """
+    global _worker
+
+    if _worker is not None:
+        return _worker
+
+    with _worker_lock:
+        if _worker is not None:
+            return _worker
+
+        def run():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        flush_last_login_updates()
+                    except Exception as e:
+                        db.session.rollback()
+                        app.logger.error("Erro ao gravar últimos logins: %s", e)
+
+        _worker = threading.Thread(target=run, name='last-login-worker', daemon=True)
+        _worker.start()
+        atexit.register(_flush_at_exit, app)
+        return _worker
@@ -0,0 +1,60 @@
+"""
+Lista de tokens JWT revogados.
+
+Os JTIs revogados ficam no Redis com TTL igual ao tempo restante de
+validade do token, de modo que a lista é compartilhada entre os workers
+e se limpa sozinha.
+
+Sem o Redis não há como saber se um token foi revogado, então as
+verificações falham fechadas com 503 em vez de aceitar o token.
+"""
+
+from datetime import datetime, timezone
+
+from redis.exceptions import RedisError
+from werkzeug.exceptions import ServiceUnavailable
+
+from app.extensions import redis_client
+from app.utils.logger import log_error
+
+# Prefixo das chaves de tokens revogados no Redis
+REVOKED_KEY_PREFIX = 'jwt:revoked:'
+
+
+def revoke_token(jti, expires_at):
+    """
+    Revogar um token até o fim da sua validade.
+    
+    Args:
+        jti (str): Identificador único do token
+        expires_at (int): Timestamp de expiração do token (claim 'exp')
+        
+    Raises:
+        ServiceUnavailable: Se o Redis não estiver acessível
+    """
+    ttl = int(expires_at - datetime.now(timezone.utc).timestamp())
+    try:
+        redis_client.setex(f'{REVOKED_KEY_PREFIX}{jti}', max(ttl, 1), 1)
+    except RedisError as e:
+        log_error(e, context={'operacao': 'revogar token', 'jti': jti})
+        raise ServiceUnavailable('Não foi possível revogar o token') from e
+
+
+def is_token_revoked(jti):
+    """
+    Verificar se um token foi revogado.
+    
+    Args:
+        jti (str): Identificador único do token
+        
+    Returns:
+        bool: True se o token estiver na lista de revogados
+        
+    Raises:
+        ServiceUnavailable: Se o Redis não estiver acessível
+    """
+    try:
+        return redis_client.exists(f'{REVOKED_KEY_PREFIX}{jti}') > 0
+    except RedisError as e:
+        log_error(e, context={'operacao': 'verificar revogação de token', 'jti': jti})
+        raise ServiceUnavailable('Não foi possível verificar a revogação do token') from e
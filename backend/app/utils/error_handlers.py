@@ -5,7 +5,8 @@ Este módulo define os handlers para diferentes tipos de erros
 que podem ocorrer na aplicação Flask.
 """
 
-from flask import jsonify, request
+import orjson
+from flask import Response, request
 from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError, OperationalError
 from marshmallow import ValidationError
@@ -13,6 +14,128 @@ from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 
 from app.utils.logger import log_error, log_security_event
 
+# Erros HTTP cuja resposta não depende da requisição (código -> error, message)
+_STATIC_ERROR_MESSAGES = {
+    400: ('Requisição inválida', 'A requisição contém dados inválidos'),
+    401: ('Não autorizado', 'Acesso não autorizado. Faça login para continuar.'),
+    403: ('Acesso negado', 'Você não tem permissão para acessar este recurso'),
+    404: ('Não encontrado', 'O recurso solicitado não foi encontrado'),
+    405: ('Método não permitido', 'Método HTTP não permitido para este endpoint'),
+    409: ('Conflito', 'Conflito com o estado atual do recurso'),
+    413: ('Arquivo muito grande', 'O arquivo enviado é muito grande'),
+    415: ('Tipo de arquivo não suportado', 'O tipo de arquivo enviado não é suportado'),
+    422: ('Dados não processáveis', 'Os dados enviados não podem ser processados'),
+    503: ('Serviço indisponível', 'Serviço temporariamente indisponível')
+}
+
+# Chaves ordenadas, como jsonify; chaves não textuais aparecem nas mensagens
+# do Marshmallow para itens de listas (índice do item)
+_ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(body):
+    """Serializar corpo de resposta de erro com orjson."""
+    return orjson.dumps(body, option=_ORJSON_OPTIONS)
+
+
+# Limites dos detalhes de validação devolvidos (cargas em lote podem gerar
+# milhares de mensagens)
+_MAX_ERROR_FIELDS = 20
+_MAX_FIELD_MESSAGES = 5
+
+
+def _limit_validation_messages(messages):
+    """
+    Limitar o número de campos e de mensagens por campo dos erros de validação.
+    
+    Args:
+        messages (dict|list): Mensagens do ValidationError
+        
+    Returns:
+        tuple: (mensagens limitadas, total de campos com erro, se houve corte)
+    """
+    if isinstance(messages, list):
+        return messages[:_MAX_FIELD_MESSAGES], 1, len(messages) > _MAX_FIELD_MESSAGES
+    
+    truncated = len(messages) > _MAX_ERROR_FIELDS
+    limited = {}
+    for field, field_messages in messages.items():
+        if len(limited) == _MAX_ERROR_FIELDS:
+            break
+        if isinstance(field_messages, list) and len(field_messages) > _MAX_FIELD_MESSAGES:
+            field_messages = field_messages[:_MAX_FIELD_MESSAGES]
+            truncated = True
+        limited[field] = field_messages
+    
+    return limited, len(messages), truncated
+
+
+def _error_body(error, message):
+    """Serializar o corpo JSON padrão de erro."""
+    return _dumps({'error': error, 'message': message})
+
+
+def _json_response(payload, code):
+    """Montar resposta JSON a partir de um corpo já serializado."""
+    return Response(payload, status=code, mimetype='application/json')
+
+
+# Corpos JSON serializados uma única vez, na importação
+_STATIC_ERRORS = {
+    code: _error_body(error, message)
+    for code, (error, message) in _STATIC_ERROR_MESSAGES.items()
+}
+
+# Corpos fixos dos handlers que também registram log ou inspecionam o erro
+_INTEGRITY_UNIQUE = _error_body('Dados duplicados', 'Já existe um registro com estes dados')
+_INTEGRITY_FOREIGN_KEY = _error_body('Referência inválida', 'Existe uma referência inválida nos dados')
+_INTEGRITY_GENERIC = _error_body('Erro de integridade', 'Erro ao processar os dados')
+
+# Classificação dos erros de integridade: pelo SQLSTATE do PostgreSQL
+# (unique_violation, foreign_key_violation) ou, nos demais drivers, pelo
+# texto do início da mensagem
+_INTEGRITY_BY_PGCODE = {
+    '23505': (_INTEGRITY_UNIQUE, 409),
+    '23503': (_INTEGRITY_FOREIGN_KEY, 400)
+}
+_INTEGRITY_BY_MESSAGE = (
+    ('unique constraint', (_INTEGRITY_UNIQUE, 409)),
+    ('foreign key constraint', (_INTEGRITY_FOREIGN_KEY, 400))
+)
+_DATABASE_UNAVAILABLE = _error_body(
+    'Erro de banco de dados',
+    'Erro temporário no banco de dados. Tente novamente.'
+)
+_INVALID_TOKEN = _error_body('Token inválido', 'Token de acesso inválido')
+_EXPIRED_TOKEN = _error_body('Token expirado', 'Token de acesso expirado')
+_RATE_LIMIT_EXCEEDED = _error_body(
+    'Limite de requisições excedido',
+    'Muitas requisições. Tente novamente mais tarde.'
+)
+_INTERNAL_ERROR = _error_body(
+    'Erro interno do servidor',
+    'Ocorreu um erro interno. Tente novamente mais tarde.'
+)
+
+
+def _make_static_handler(code):
+    """
+    Criar handler que devolve a resposta pré-serializada de um código HTTP.
+    
+    Args:
+        code (int): Código de status HTTP
+        
+    Returns:
+        function: Handler de erro para o Flask
+    """
+    payload = _STATIC_ERRORS[code]
+    
+    def handle_static_error(error):
+        """Handler para erros HTTP de corpo fixo."""
+        return _json_response(payload, code)
+    
+    return handle_static_error
+
 
 def register_error_handlers(app):
     """
@@ -25,11 +148,21 @@ def register_error_handlers(app):
     @app.errorhandler(ValidationError)
     def handle_validation_error(error):
         """Handler para erros de validação do Marshmallow."""
-        return jsonify({
+        details, total, truncated = _limit_validation_messages(error.messages)
+        
+        if not truncated:
+            return _json_response(_dumps({
+                'error': 'Dados inválidos',
+                'message': 'Os dados enviados contêm erros de validação',
+                'details': details
+            }), 400)
+        
+        return _json_response(_dumps({
             'error': 'Dados inválidos',
-            'message': 'Os dados enviados contêm erros de validação',
-            'details': error.messages
-        }), 400
+            'message': f'{total} campos com erros de validação',
+            'details': details,
+            'truncated': True
+        }), 400)
     
     @app.errorhandler(IntegrityError)
     def handle_integrity_error(error):
@@ -38,33 +171,24 @@ def register_error_handlers(app):
         log_error(error, context={'endpoint': request.endpoint})
         
         # Verificar tipo específico de erro
-        error_message = str(error.orig)
+        resposta = _INTEGRITY_BY_PGCODE.get(getattr(error.orig, 'pgcode', None))
+        
+        if resposta is None:
+            # Só o início da mensagem (o driver anexa SQL e parâmetros)
+            error_message = str(error.orig)[:256].lower()
+            resposta = next(
+                (r for trecho, r in _INTEGRITY_BY_MESSAGE if trecho in error_message),
+                (_INTEGRITY_GENERIC, 400)
+            )
         
-        if 'unique constraint' in error_message.lower():
-            return jsonify({
-                'error': 'Dados duplicados',
-                'message': 'Já existe um registro com estes dados'
-            }), 409
-        elif 'foreign key constraint' in error_message.lower():
-            return jsonify({
-                'error': 'Referência inválida',
-                'message': 'Existe uma referência inválida nos dados'
-            }), 400
-        else:
-            return jsonify({
-                'error': 'Erro de integridade',
-                'message': 'Erro ao processar os dados'
-            }), 400
+        return _json_response(*resposta)
     
     @app.errorhandler(OperationalError)
     def handle_operational_error(error):
         """Handler para erros operacionais do banco de dados."""
         log_error(error, context={'endpoint': request.endpoint})
         
-        return jsonify({
-            'error': 'Erro de banco de dados',
-            'message': 'Erro temporário no banco de dados. Tente novamente.'
-        }), 503
+        return _json_response(_DATABASE_UNAVAILABLE, 503)
     
     @app.errorhandler(InvalidTokenError)
     def handle_invalid_token_error(error):
@@ -75,90 +199,16 @@ def register_error_handlers(app):
             ip_address=request.remote_addr
         )
         
-        return jsonify({
-            'error': 'Token inválido',
-            'message': 'Token de acesso inválido'
-        }), 401
+        return _json_response(_INVALID_TOKEN, 401)
     
     @app.errorhandler(ExpiredSignatureError)
     def handle_expired_token_error(error):
         """Handler para erros de token JWT expirado."""
-        return jsonify({
-            'error': 'Token expirado',
-            'message': 'Token de acesso expirado'
-        }), 401
+        return _json_response(_EXPIRED_TOKEN, 401)
     
-    @app.errorhandler(400)
-    def handle_bad_request(error):
-        """Handler para Bad Request (400)."""
-        return jsonify({
-            'error': 'Requisição inválida',
-            'message': 'A requisição contém dados inválidos'
-        }), 400
-    
-    @app.errorhandler(401)
-    def handle_unauthorized(error):
-        """Handler para Unauthorized (401)."""
-        return jsonify({
-            'error': 'Não autorizado',
-            'message': 'Acesso não autorizado. Faça login para continuar.'
-        }), 401
-    
-    @app.errorhandler(403)
-    def handle_forbidden(error):
-        """Handler para Forbidden (403)."""
-        return jsonify({
-            'error': 'Acesso negado',
-            'message': 'Você não tem permissão para acessar este recurso'
-        }), 403
-    
-    @app.errorhandler(404)
-    def handle_not_found(error):
-        """Handler para Not Found (404)."""
-        return jsonify({
-            'error': 'Não encontrado',
-            'message': 'O recurso solicitado não foi encontrado'
-        }), 404
-    
-    @app.errorhandler(405)
-    def handle_method_not_allowed(error):
-        """Handler para Method Not Allowed (405)."""
-        return jsonify({
-            'error': 'Método não permitido',
-            'message': 'Método HTTP não permitido para este endpoint'
-        }), 405
-    
-    @app.errorhandler(409)
-    def handle_conflict(error):
-        """Handler para Conflict (409)."""
-        return jsonify({
-            'error': 'Conflito',
-            'message': 'Conflito com o estado atual do recurso'
-        }), 409
-    
-    @app.errorhandler(413)
-    def handle_payload_too_large(error):
-        """Handler para Payload Too Large (413)."""
-        return jsonify({
-            'error': 'Arquivo muito grande',
-            'message': 'O arquivo enviado é muito grande'
-        }), 413
-    
-    @app.errorhandler(415)
-    def handle_unsupported_media_type(error):
-        """Handler para Unsupported Media Type (415)."""
-        return jsonify({
-            'error': 'Tipo de arquivo não suportado',
-            'message': 'O tipo de arquivo enviado não é suportado'
-        }), 415
-    
-    @app.errorhandler(422)
-    def handle_unprocessable_entity(error):
-        """Handler para Unprocessable Entity (422)."""
-        return jsonify({
-            'error': 'Dados não processáveis',
-            'message': 'Os dados enviados não podem ser processados'
-        }), 422
+    # Erros HTTP de corpo fixo: um handler por código com a resposta pronta
+    for code in _STATIC_ERRORS:
+        app.register_error_handler(code, _make_static_handler(code))
     
     @app.errorhandler(429)
     def handle_rate_limit_exceeded(error):
@@ -169,10 +219,7 @@ def register_error_handlers(app):
             ip_address=request.remote_addr
         )
         
-        return jsonify({
-            'error': 'Limite de requisições excedido',
-            'message': 'Muitas requisições. Tente novamente mais tarde.'
-        }), 429
+        return _json_response(_RATE_LIMIT_EXCEEDED, 429)
     
     @app.errorhandler(500)
     def handle_internal_server_error(error):
@@ -186,22 +233,10 @@ def register_error_handlers(app):
             }
         )
         
-        return jsonify({
-            'error': 'Erro interno do servidor',
-            'message': 'Ocorreu um erro interno. Tente novamente mais tarde.'
-        }), 500
-    
-    @app.errorhandler(503)
-    def handle_service_unavailable(error):
-        """Handler para Service Unavailable (503)."""
-        return jsonify({
-            'error': 'Serviço indisponível',
-            'message': 'Serviço temporariamente indisponível'
-        }), 503
+        return _json_response(_INTERNAL_ERROR, 500)
     
-    @app.errorhandler(Exception)
-    def handle_generic_exception(error):
-        """Handler genérico para exceções não tratadas."""
+    def _log_unhandled_exception(error):
+        """Registrar exceção não tratada com o contexto da requisição."""
         log_error(
             error,
             context={
@@ -210,19 +245,28 @@ def register_error_handlers(app):
                 'url': request.url
             }
         )
-        
-        # Em produção, não expor detalhes do erro
-        if app.config.get('DEBUG', False):
-            return jsonify({
+    
+    # O modo debug não muda depois da criação da aplicação: o handler
+    # genérico é escolhido aqui em vez de consultar a config a cada erro
+    if app.config.get('DEBUG', False):
+        @app.errorhandler(Exception)
+        def handle_generic_exception(error):
+            """Handler genérico para exceções não tratadas (com detalhes, em debug)."""
+            _log_unhandled_exception(error)
+            
+            return _json_response(_dumps({
                 'error': 'Erro interno',
                 'message': str(error),
                 'type': type(error).__name__
-            }), 500
-        else:
-            return jsonify({
-                'error': 'Erro interno do servidor',
-                'message': 'Ocorreu um erro interno. Tente novamente mais tarde.'
-            }), 500
+            }), 500)
+    else:
+        @app.errorhandler(Exception)
+        def handle_generic_exception(error):
+            """Handler genérico para exceções não tratadas."""
+            _log_unhandled_exception(error)
+            
+            # Em produção, não expor detalhes do erro
+            return _json_response(_INTERNAL_ERROR, 500)
 
 
 class APIException(Exception):
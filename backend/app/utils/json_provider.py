@@ -0,0 +1,91 @@
+"""
+Serialização JSON das respostas com orjson.
+
+Substitui o provedor padrão do Flask (baseado no módulo json da
+biblioteca padrão) por um que usa orjson, bem mais rápido para
+payloads com datetime, UUID e Enum.
+"""
+
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# Datetimes sem fuso são tratados como UTC (o sistema grava em utcnow);
+# chaves não textuais são convertidas para string, como no módulo json
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+# Opções de formatação do módulo json: a saída do orjson já é compacta e em
+# UTF-8, então são aceitas e ignoradas (o serializador de sessão do Flask
+# passa separators). As demais mudariam o resultado e são recusadas.
+_IGNORED_JSON_OPTIONS = frozenset({'separators', 'ensure_ascii', 'indent'})
+
+
+def _default(obj):
+    """Serializar tipos que o orjson não suporta nativamente."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Objeto do tipo {type(obj).__name__} não é serializável em JSON')
+
+
+def _chain_default(default):
+    """Combinar um serializador informado pelo chamador com o padrão."""
+    def chained(obj):
+        try:
+            return default(obj)
+        except TypeError:
+            return _default(obj)
+    return chained
+
+
+class OrjsonProvider(JSONProvider):
+    """Provedor JSON do Flask baseado em orjson."""
+    
+    # Ordenar chaves, como o provedor padrão do Flask
+    sort_keys = True
+    
+    def dumps(self, obj, *, default=None, sort_keys=None, **kwargs):
+        """
+        Serializar objeto para string JSON.
+        
+        Args:
+            obj: Objeto a serializar
+            default (callable, optional): Serializador para tipos não suportados
+                (tentado antes do serializador padrão do provedor)
+            sort_keys (bool, optional): Ordenar chaves (padrão: self.sort_keys)
+        
+        Returns:
+            str: JSON serializado
+            
+        Raises:
+            TypeError: Se forem passadas opções do módulo json que alterariam
+                o resultado (separators, ensure_ascii e indent são ignoradas)
+        """
+        nao_suportadas = kwargs.keys() - _IGNORED_JSON_OPTIONS
+        if nao_suportadas:
+            raise TypeError(
+                f'Opções não suportadas pelo OrjsonProvider: {", ".join(sorted(nao_suportadas))}'
+            )
+        
+        option = _ORJSON_OPTIONS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        
+        if default is not None:
+            return orjson.dumps(obj, default=_chain_default(default), option=option).decode('utf-8')
+        return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        """
+        Desserializar string ou bytes JSON.
+        
+        Args:
+            s (str|bytes): JSON a desserializar
+        
+        Returns:
+            object: Objeto desserializado
+        """
+        return orjson.loads(s)
@@ -5,10 +5,70 @@ Este módulo configura o sistema de logs da aplicação Flask.
 """
 
 import os
+import time
+import queue
 import logging
+import threading
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
+from flask import current_app, request, g
+from flask_jwt_extended import get_jwt_identity
+
+# Eventos de segurança aguardando gravação pela thread de logging
+_SECURITY_LOG_QUEUE = queue.SimpleQueue()
+_SECURITY_LOG_BATCH = 100
+_security_log_thread = None
+_security_log_lock = threading.Lock()
+
+
+class _SecurityEvent:
+    """
+    Evento de segurança aguardando gravação.
+    
+    Guarda só os valores brutos; o timestamp e o texto (mesmo formato do
+    dicionário usado antes) são montados pela thread de logging.
+    """
+    
+    __slots__ = ('timestamp', 'event_type', 'user_id', 'ip_address', 'details')
+    
+    def __init__(self, event_type, details, user_id, ip_address):
+        self.timestamp = datetime.utcnow()
+        self.event_type = event_type
+        self.user_id = user_id
+        self.ip_address = ip_address
+        self.details = details
+    
+    def __repr__(self):
+        return repr({
+            'timestamp': self.timestamp.isoformat(),
+            'event_type': self.event_type,
+            'user_id': str(self.user_id) if self.user_id else None,
+            'ip_address': self.ip_address,
+            'details': self.details
+        })
+
+
+class _ErrorEntry:
+    """Erro da aplicação, formatado apenas quando o registro é emitido."""
+    
+    __slots__ = ('timestamp', 'error', 'user_id', 'context')
+    
+    def __init__(self, error, context, user_id):
+        self.timestamp = datetime.utcnow()
+        self.error = error
+        self.user_id = user_id
+        self.context = context
+    
+    def __repr__(self):
+        return repr({
+            'timestamp': self.timestamp.isoformat(),
+            'error_type': type(self.error).__name__,
+            'error_message': str(self.error),
+            'user_id': str(self.user_id) if self.user_id else None,
+            'context': self.context or {}
+        })
+
 
 def setup_logging(app):
     """
@@ -69,7 +129,9 @@ def log_user_action(user_id, action, details=None):
         action (str): Ação realizada
         details (dict, optional): Detalhes adicionais da ação
     """
-    from flask import current_app
+    logger = current_app.logger
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     log_entry = {
         'timestamp': datetime.utcnow().isoformat(),
@@ -78,7 +140,7 @@ def log_user_action(user_id, action, details=None):
         'details': details or {}
     }
     
-    current_app.logger.info(f"USER_ACTION: {log_entry}")
+    logger.info('USER_ACTION: %s', log_entry)
 
 
 def log_api_request(endpoint, method, user_id=None, ip_address=None):
@@ -91,7 +153,9 @@ def log_api_request(endpoint, method, user_id=None, ip_address=None):
         user_id (str, optional): ID do usuário
         ip_address (str, optional): Endereço IP
     """
-    from flask import current_app
+    logger = current_app.logger
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     log_entry = {
         'timestamp': datetime.utcnow().isoformat(),
@@ -101,7 +165,7 @@ def log_api_request(endpoint, method, user_id=None, ip_address=None):
         'ip_address': ip_address
     }
     
-    current_app.logger.info(f"API_REQUEST: {log_entry}")
+    logger.info('API_REQUEST: %s', log_entry)
 
 
 def log_security_event(event_type, details, user_id=None, ip_address=None):
@@ -114,17 +178,48 @@ def log_security_event(event_type, details, user_id=None, ip_address=None):
         user_id (str, optional): ID do usuário
         ip_address (str, optional): Endereço IP
     """
-    from flask import current_app
+    logger = current_app.logger
+    if not logger.isEnabledFor(logging.WARNING):
+        return
     
-    log_entry = {
-        'timestamp': datetime.utcnow().isoformat(),
-        'event_type': event_type,
-        'user_id': str(user_id) if user_id else None,
-        'ip_address': ip_address,
-        'details': details
-    }
+    # A gravação (e a formatação) fica com a thread de logging, para não
+    # atrasar a resposta
+    _ensure_security_log_thread()
+    _SECURITY_LOG_QUEUE.put_nowait(
+        (logger, _SecurityEvent(event_type, details, user_id, ip_address))
+    )
+
+
+def _ensure_security_log_thread():
+    """Iniciar a thread de gravação dos eventos de segurança, se necessário."""
+    global _security_log_thread
+    
+    if _security_log_thread is not None:
+        return
     
-    current_app.logger.warning(f"SECURITY_EVENT: {log_entry}")
+    with _security_log_lock:
+        if _security_log_thread is None:
+            _security_log_thread = threading.Thread(
+                target=_drain_security_events,
+                name='security-log-writer',
+                daemon=True
+            )
+            _security_log_thread.start()
+
+
+def _drain_security_events():
+    """Gravar os eventos de segurança enfileirados, em lotes."""
+    while True:
+        lote = [_SECURITY_LOG_QUEUE.get()]
+        
+        while len(lote) < _SECURITY_LOG_BATCH:
+            try:
+                lote.append(_SECURITY_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        
+        for logger, log_entry in lote:
+            logger.warning('SECURITY_EVENT: %s', log_entry)
 
 
 def log_data_access(data_type, record_id, action, user_id):
@@ -137,7 +232,9 @@ def log_data_access(data_type, record_id, action, user_id):
         action (str): Ação realizada (CREATE, READ, UPDATE, DELETE)
         user_id (str): ID do usuário
     """
-    from flask import current_app
+    logger = current_app.logger
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     log_entry = {
         'timestamp': datetime.utcnow().isoformat(),
@@ -147,7 +244,7 @@ def log_data_access(data_type, record_id, action, user_id):
         'user_id': str(user_id)
     }
     
-    current_app.logger.info(f"DATA_ACCESS: {log_entry}")
+    logger.info('DATA_ACCESS: %s', log_entry)
 
 
 def log_error(error, context=None, user_id=None):
@@ -159,17 +256,11 @@ def log_error(error, context=None, user_id=None):
         context (dict, optional): Contexto adicional
         user_id (str, optional): ID do usuário
     """
-    from flask import current_app
-    
-    log_entry = {
-        'timestamp': datetime.utcnow().isoformat(),
-        'error_type': type(error).__name__,
-        'error_message': str(error),
-        'user_id': str(user_id) if user_id else None,
-        'context': context or {}
-    }
+    logger = current_app.logger
+    if not logger.isEnabledFor(logging.ERROR):
+        return
     
-    current_app.logger.error(f"APPLICATION_ERROR: {log_entry}")
+    logger.error('APPLICATION_ERROR: %s', _ErrorEntry(error, context, user_id))
 
 
 class RequestLogger:
@@ -187,14 +278,16 @@ class RequestLogger:
     
     def log_request(self):
         """Registrar dados da requisição."""
-        from flask import request, g
-        from flask_jwt_extended import get_jwt_identity
+        # Contador de alta resolução: só a duração interessa, sem criar datetime
+        g.start_time = time.perf_counter()
         
-        g.start_time = datetime.utcnow()
+        if not current_app.logger.isEnabledFor(logging.INFO):
+            return
         
         try:
             user_id = get_jwt_identity()
-        except:
+        except RuntimeError:
+            # JWT ainda não verificado nesta requisição
             user_id = None
         
         log_api_request(
@@ -206,14 +299,12 @@ class RequestLogger:
     
     def log_response(self, response):
         """Registrar dados da resposta."""
-        from flask import g, current_app
-        
         if hasattr(g, 'start_time'):
-            duration = (datetime.utcnow() - g.start_time).total_seconds()
+            duration = time.perf_counter() - g.start_time
             
             if duration > 1.0:  # Log apenas requisições demoradas
                 current_app.logger.warning(
-                    f"SLOW_REQUEST: {duration:.2f}s - {response.status_code}"
+                    'SLOW_REQUEST: %.2fs - %s', duration, response.status_code
                 )
         
         return response
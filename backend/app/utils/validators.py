@@ -6,6 +6,34 @@ Este módulo contém funções para validação de dados como CPF, email, etc.
 
 import re
 from datetime import date
+from operator import mul
+
+# Pesos dos dígitos verificadores do CPF (sobre os 9 e 10 primeiros dígitos)
+_PESOS_DV1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+_PESOS_DV2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+_AJUSTE_DV1 = 48 * sum(_PESOS_DV1)
+_AJUSTE_DV2 = 48 * sum(_PESOS_DV2)
+
+# Formato de email aceito (\Z rejeita a quebra de linha final que $ aceitaria)
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
+
+def _somente_digitos(texto):
+    """
+    Remover caracteres não numéricos.
+    
+    Entradas já compostas só por dígitos (o caso mais comum) são devolvidas
+    sem passar pelo filtro caractere a caractere.
+    """
+    if texto.isdigit():
+        return texto
+    return ''.join(filter(str.isdigit, texto))
+
+
+def _digito_verificador(codigos, pesos, ajuste):
+    """Calcular um dígito verificador do CPF a partir dos códigos ASCII."""
+    resto = (sum(map(mul, codigos, pesos)) - ajuste) % 11
+    return 0 if resto < 2 else 11 - resto
 
 
 def validate_cpf(cpf):
@@ -18,36 +46,26 @@ def validate_cpf(cpf):
     Returns:
         bool: True se o CPF for válido, False caso contrário
     """
-    # Remover caracteres não numéricos
-    cpf = ''.join(filter(str.isdigit, cpf))
+    # Remover caracteres não numéricos (sem custo se o CPF vier só com dígitos)
+    cpf = _somente_digitos(cpf)
     
-    # Verificar se tem 11 dígitos
-    if len(cpf) != 11:
+    # Verificar se tem 11 dígitos ASCII
+    if len(cpf) != 11 or not cpf.isascii():
         return False
     
     # Verificar se todos os dígitos são iguais (CPF inválido)
     if cpf == cpf[0] * 11:
         return False
     
-    # Calcular primeiro dígito verificador
-    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-    resto = soma % 11
-    primeiro_digito = 0 if resto < 2 else 11 - resto
-    
-    # Verificar primeiro dígito
-    if int(cpf[9]) != primeiro_digito:
-        return False
-    
-    # Calcular segundo dígito verificador
-    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-    resto = soma % 11
-    segundo_digito = 0 if resto < 2 else 11 - resto
+    # Códigos ASCII dos dígitos ('0' == 48); o deslocamento é descontado
+    # de uma vez na soma ponderada
+    codigos = cpf.encode('ascii')
     
-    # Verificar segundo dígito
-    if int(cpf[10]) != segundo_digito:
+    # Verificar primeiro e segundo dígitos verificadores
+    if codigos[9] - 48 != _digito_verificador(codigos, _PESOS_DV1, _AJUSTE_DV1):
         return False
     
-    return True
+    return codigos[10] - 48 == _digito_verificador(codigos, _PESOS_DV2, _AJUSTE_DV2)
 
 
 def validate_email(email):
@@ -60,8 +78,7 @@ def validate_email(email):
     Returns:
         bool: True se o email for válido, False caso contrário
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.match(email) is not None
 
 
 def validate_phone(phone):
@@ -75,7 +92,7 @@ def validate_phone(phone):
         bool: True se o telefone for válido, False caso contrário
     """
     # Remover caracteres não numéricos
-    phone = ''.join(filter(str.isdigit, phone))
+    phone = _somente_digitos(phone)
     
     # Verificar se tem entre 10 e 11 dígitos
     return len(phone) in [10, 11]
@@ -87,7 +104,8 @@ def validate_date_range(start_date, end_date=None):
     
     Args:
         start_date (date): Data inicial
-        end_date (date, optional): Data final (padrão: hoje)
+        end_date (date, optional): Data final (padrão: hoje); em lotes,
+            obtenha a data uma vez e repasse aqui
         
     Returns:
         bool: True se a data estiver no range válido
@@ -101,7 +119,7 @@ def validate_date_range(start_date, end_date=None):
     return start_date <= end_date
 
 
-def validate_age_range(birth_date, min_age=0, max_age=120):
+def validate_age_range(birth_date, min_age=0, max_age=120, today=None):
     """
     Validar se a idade está em um range válido.
     
@@ -109,6 +127,8 @@ def validate_age_range(birth_date, min_age=0, max_age=120):
         birth_date (date): Data de nascimento
         min_age (int): Idade mínima
         max_age (int): Idade máxima
+        today (date, optional): Data de referência (padrão: hoje); ao validar
+            vários registros, obtenha a data uma vez e repasse aqui
         
     Returns:
         bool: True se a idade estiver no range válido
@@ -116,7 +136,8 @@ def validate_age_range(birth_date, min_age=0, max_age=120):
     if not isinstance(birth_date, date):
         return False
     
-    today = date.today()
+    if today is None:
+        today = date.today()
     age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
     
     return min_age <= age <= max_age
@@ -133,7 +154,7 @@ def format_cpf(cpf):
         str: CPF formatado (000.000.000-00)
     """
     # Remover caracteres não numéricos
-    cpf = ''.join(filter(str.isdigit, cpf))
+    cpf = _somente_digitos(cpf)
     
     if len(cpf) != 11:
         return cpf
@@ -152,7 +173,7 @@ def format_phone(phone):
         str: Telefone formatado
     """
     # Remover caracteres não numéricos
-    phone = ''.join(filter(str.isdigit, phone))
+    phone = _somente_digitos(phone)
     
     if len(phone) == 10:
         # Telefone fixo: (11) 1234-5678
@@ -178,8 +199,10 @@ def sanitize_string(text, max_length=None):
     if not text:
         return ''
     
-    # Remover espaços extras
-    text = ' '.join(text.split())
+    # Remover espaços extras; o texto já normalizado (sem espaços duplos ou
+    # nas pontas e sem outro tipo de espaço, que nunca é imprimível) é mantido
+    if '  ' in text or text[0] == ' ' or text[-1] == ' ' or not text.isprintable():
+        text = ' '.join(text.split())
     
     # Limitar tamanho se especificado
     if max_length and len(text) > max_length:
@@ -200,7 +223,8 @@ def validate_score_range(score, min_score=1, max_score=10):
     Returns:
         bool: True se a pontuação estiver no range válido
     """
-    if not isinstance(score, int):
+    # type() em vez de isinstance: bool é subclasse de int e não é pontuação
+    if type(score) is not int:
         return False
     
     return min_score <= score <= max_score
@@ -8,7 +8,7 @@ import click
 from flask.cli import with_appcontext
 
 from app.extensions import db
-from seed_data import init_database, seed_database
+from seed_data import init_database, migrate_termo_satellites, seed_database
 
 
 @click.command()
@@ -39,8 +39,18 @@ def reset_db():
     click.echo('Banco de dados resetado!')
 
 
+@click.command()
+@with_appcontext
+def migrate_termos():
+    """Copiar responsável legal e testemunhas para as tabelas satélite."""
+    click.echo('Copiando dados dos termos de consentimento...')
+    copiadas = migrate_termo_satellites()
+    click.echo(f'{copiadas} linhas copiadas!')
+
+
 def register_commands(app):
     """Registrar comandos CLI na aplicação."""
     app.cli.add_command(init_db)
     app.cli.add_command(seed_db)
     app.cli.add_command(reset_db)
+    app.cli.add_command(migrate_termos)
@@ -7,6 +7,7 @@ Este script cria usuários padrão e dados de exemplo para desenvolvimento.
 import os
 from datetime import date, datetime
 from flask import current_app
+from sqlalchemy import inspect, text
 
 from app import create_app
 from app.extensions import db
@@ -16,46 +17,46 @@ from app.models.beneficiaria import Beneficiaria
 
 def create_default_users():
     """Criar usuários padrão do sistema."""
-    print("Criando usuários padrão...")
-    
-    # Administrador padrão
-    admin_email = current_app.config.get('DEFAULT_ADMIN_EMAIL', 'admin@movemarias.dev')
-    admin_password = current_app.config.get('DEFAULT_ADMIN_PASSWORD', 'admin123')
-    
-    admin = Usuario.find_by_email(admin_email)
-    if not admin:
-        admin = Usuario(
-            nome='Administrador do Sistema',
-            email=admin_email,
-            senha=admin_password,
-            tipo_usuario=TipoUsuarioEnum.ADMIN
-        )
-        db.session.add(admin)
-        print(f"Usuário administrador criado: {admin_email}")
-    else:
-        print(f"Usuário administrador já existe: {admin_email}")
-    
-    # Profissional padrão
-    prof_email = current_app.config.get('DEFAULT_PROF_EMAIL', 'profissional@movemarias.dev')
-    prof_password = current_app.config.get('DEFAULT_PROF_PASSWORD', 'prof123')
-    
-    profissional = Usuario.find_by_email(prof_email)
-    if not profissional:
-        profissional = Usuario(
-            nome='Maria Silva',
-            email=prof_email,
-            senha=prof_password,
-            tipo_usuario=TipoUsuarioEnum.PROFISSIONAL
-        )
-        db.session.add(profissional)
-        print(f"Usuário profissional criado: {prof_email}")
-    else:
-        print(f"Usuário profissional já existe: {prof_email}")
+    current_app.logger.info("Criando usuários padrão...")
+    
+    usuarios_padrao = [
+        {
+            'nome': 'Administrador do Sistema',
+            'email': current_app.config.get('DEFAULT_ADMIN_EMAIL', 'admin@movemarias.dev'),
+            'senha': current_app.config.get('DEFAULT_ADMIN_PASSWORD', 'admin123'),
+            'tipo_usuario': TipoUsuarioEnum.ADMIN,
+            'descricao': 'administrador'
+        },
+        {
+            'nome': 'Maria Silva',
+            'email': current_app.config.get('DEFAULT_PROF_EMAIL', 'profissional@movemarias.dev'),
+            'senha': current_app.config.get('DEFAULT_PROF_PASSWORD', 'prof123'),
+            'tipo_usuario': TipoUsuarioEnum.PROFISSIONAL,
+            'descricao': 'profissional'
+        }
+    ]
+    
+    # Verificar de uma vez quais emails já existem
+    existentes = Usuario.find_by_emails(u['email'] for u in usuarios_padrao)
+    
+    for dados in usuarios_padrao:
+        if dados['email'].lower().strip() in existentes:
+            current_app.logger.info("Usuário %s já existe: %s", dados['descricao'], dados['email'])
+            continue
+        
+        # O construtor é mantido para gerar o hash da senha
+        db.session.add(Usuario(
+            nome=dados['nome'],
+            email=dados['email'],
+            senha=dados['senha'],
+            tipo_usuario=dados['tipo_usuario']
+        ))
+        current_app.logger.info("Usuário %s criado: %s", dados['descricao'], dados['email'])
 
 
 def create_sample_beneficiarias():
     """Criar beneficiárias de exemplo."""
-    print("Criando beneficiárias de exemplo...")
+    current_app.logger.info("Criando beneficiárias de exemplo...")
     
     beneficiarias_exemplo = [
         {
@@ -90,55 +91,138 @@ def create_sample_beneficiarias():
         }
     ]
     
+    # Normalizar como o construtor de Beneficiaria (nome e CPF formatado)
+    for beneficiaria_data in beneficiarias_exemplo:
+        beneficiaria_data['nome_completo'] = beneficiaria_data['nome_completo'].strip().title()
+        beneficiaria_data['cpf'] = Beneficiaria._format_cpf(beneficiaria_data['cpf'])
+    
+    # Verificar de uma vez quais CPFs já existem
+    existentes = Beneficiaria.find_by_cpfs(b['cpf'] for b in beneficiarias_exemplo)
+    
+    novas = []
     for beneficiaria_data in beneficiarias_exemplo:
-        # Verificar se já existe
-        existing = Beneficiaria.find_by_cpf(beneficiaria_data['cpf'])
-        if not existing:
-            beneficiaria = Beneficiaria(**beneficiaria_data)
-            db.session.add(beneficiaria)
-            print(f"Beneficiária criada: {beneficiaria_data['nome_completo']}")
+        if beneficiaria_data['cpf'] in existentes:
+            current_app.logger.info("Beneficiária já existe: %s", beneficiaria_data['nome_completo'])
         else:
-            print(f"Beneficiária já existe: {beneficiaria_data['nome_completo']}")
+            novas.append(beneficiaria_data)
+    
+    if not novas:
+        return
+    
+    # Seed de desenvolvimento: não esperar o flush do WAL no commit
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('SET LOCAL synchronous_commit = OFF'))
+    
+    db.session.bulk_insert_mappings(Beneficiaria, novas)
+    current_app.logger.info("Beneficiárias de exemplo criadas: %d", len(novas))
 
 
 def seed_database():
     """
     Executar seed completo do banco de dados.
+    
+    Todas as inserções acontecem em uma única transação: em caso de erro
+    nada é gravado.
     """
-    print("Iniciando seed do banco de dados...")
+    current_app.logger.info("Iniciando seed do banco de dados...")
     
     try:
-        # Criar usuários padrão
-        create_default_users()
+        with db.session.begin():
+            # Criar usuários padrão
+            create_default_users()
+            
+            # Criar beneficiárias de exemplo (apenas em desenvolvimento)
+            if current_app.config.get('SEED_DATABASE', False):
+                create_sample_beneficiarias()
         
-        # Criar beneficiárias de exemplo (apenas em desenvolvimento)
-        if current_app.config.get('SEED_DATABASE', False):
-            create_sample_beneficiarias()
-        
-        # Commit das alterações
-        db.session.commit()
-        print("Seed do banco de dados concluído com sucesso!")
+        current_app.logger.info("Seed do banco de dados concluído com sucesso!")
         
     except Exception as e:
-        db.session.rollback()
-        print(f"Erro durante o seed: {e}")
+        current_app.logger.error("Erro durante o seed: %s", e)
         raise
 
 
+# Colunas antigas de termos_consentimento -> tabelas satélite. Cada INSERT só
+# copia termos que ainda não têm linha no destino, então rodar de novo é seguro.
+_COPIA_SATELITES_TERMO = (
+    """
+    INSERT INTO responsavel_legal (termo_id, nome, cpf, parentesco)
+    SELECT t.id, t.nome_responsavel_legal, t.cpf_responsavel_legal, t.parentesco_responsavel
+    FROM termos_consentimento t
+    WHERE (t.nome_responsavel_legal IS NOT NULL
+           OR t.cpf_responsavel_legal IS NOT NULL
+           OR t.parentesco_responsavel IS NOT NULL)
+      AND NOT EXISTS (SELECT 1 FROM responsavel_legal r WHERE r.termo_id = t.id)
+    """,
+    """
+    INSERT INTO testemunhas_termo (termo_id, ordem, nome, cpf)
+    SELECT t.id, 1, t.nome_testemunha1, t.cpf_testemunha1
+    FROM termos_consentimento t
+    WHERE (t.nome_testemunha1 IS NOT NULL OR t.cpf_testemunha1 IS NOT NULL)
+      AND NOT EXISTS (
+          SELECT 1 FROM testemunhas_termo w WHERE w.termo_id = t.id AND w.ordem = 1
+      )
+    """,
+    """
+    INSERT INTO testemunhas_termo (termo_id, ordem, nome, cpf)
+    SELECT t.id, 2, t.nome_testemunha2, t.cpf_testemunha2
+    FROM termos_consentimento t
+    WHERE (t.nome_testemunha2 IS NOT NULL OR t.cpf_testemunha2 IS NOT NULL)
+      AND NOT EXISTS (
+          SELECT 1 FROM testemunhas_termo w WHERE w.termo_id = t.id AND w.ordem = 2
+      )
+    """,
+)
+
+_COLUNAS_LEGADAS_TERMO = {
+    'nome_responsavel_legal', 'cpf_responsavel_legal', 'parentesco_responsavel',
+    'nome_testemunha1', 'cpf_testemunha1', 'nome_testemunha2', 'cpf_testemunha2',
+}
+
+
+def migrate_termo_satellites():
+    """
+    Copiar responsável legal e testemunhas das colunas antigas de
+    termos_consentimento para responsavel_legal e testemunhas_termo.
+    
+    Precisa rodar depois do create_all (que cria as tabelas novas) e antes
+    de remover as colunas antigas. Bancos criados já sem essas colunas são
+    ignorados.
+    
+    Returns:
+        int: Número de linhas copiadas
+    """
+    colunas = {c['name'] for c in inspect(db.engine).get_columns('termos_consentimento')}
+    if not _COLUNAS_LEGADAS_TERMO <= colunas:
+        current_app.logger.info("termos_consentimento sem colunas legadas, nada a copiar")
+        return 0
+    
+    copiadas = 0
+    with db.session.begin():
+        for sql in _COPIA_SATELITES_TERMO:
+            copiadas += db.session.execute(text(sql)).rowcount
+    
+    current_app.logger.info("Dados de termos copiados para tabelas satélite: %d linhas", copiadas)
+    return copiadas
+
+
 def init_database():
     """
     Inicializar banco de dados (criar tabelas e seed).
     """
-    print("Inicializando banco de dados...")
+    current_app.logger.info("Inicializando banco de dados...")
     
     # Criar tabelas
     try:
         db.create_all()
-        print("Tabelas criadas com sucesso!")
+        current_app.logger.info("Tabelas criadas com sucesso!")
     except Exception as e:
-        print(f"Erro ao criar tabelas: {e}")
+        current_app.logger.error("Erro ao criar tabelas: %s", e)
         raise
     
+    # Bancos antigos ainda guardam responsável/testemunhas em termos_consentimento
+    migrate_termo_satellites()
+    
     # Executar seed
     seed_database()
 
@@ -0,0 +1,36 @@
+"""
+Testes do provedor JSON baseado em orjson.
+"""
+
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def app():
+    """Aplicação de testes com chave secreta (sessão assinada ativa)."""
+    app = create_app('testing')
+    app.config['SECRET_KEY'] = 'chave-de-teste'
+    return app
+
+
+def test_requisicao_com_sessao_assinada(app):
+    """O serializador de sessão do Flask passa separators para json.dumps."""
+    resposta = app.test_client().get('/live')
+    
+    assert resposta.status_code == 200
+
+
+def test_opcoes_de_formatacao_sao_ignoradas(app):
+    """separators, ensure_ascii e indent não alteram a saída do orjson."""
+    dados = {'b': 1, 'a': 'ação'}
+    
+    assert app.json.dumps(dados, separators=(',', ':'), ensure_ascii=True, indent=2) == \
+        app.json.dumps(dados)
+
+
+def test_opcao_que_altera_saida_e_recusada(app):
+    """Opções sem equivalente no orjson continuam gerando erro."""
+    with pytest.raises(TypeError):
+        app.json.dumps({}, allow_nan=False)